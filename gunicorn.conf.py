@@ -0,0 +1,35 @@
+"""
+Настройки gunicorn; читаются из текущего каталога автоматически.
+
+preload_app: приложение импортируется и прогревается (portal/warmup.py)
+один раз в мастере до fork-а, воркеры стартуют с готовыми шаблонами и
+делят с мастером страницы памяти. GUNICORN_PRELOAD=False — прежний
+ленивый запуск: каждый воркер грузит Django и шаблоны сам.
+"""
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "3"))
+preload_app = os.getenv("GUNICORN_PRELOAD", "True") == "True"
+
+
+def when_ready(server):
+    # с preload_app приложение уже загружено, воркеры ещё не запущены
+    if not preload_app:
+        return
+    from portal.warmup import warm_up
+
+    stats = warm_up()
+    server.log.info(
+        "Прогрев: %d шаблонов за %.0f мс, объекты заморожены (gc.freeze)",
+        stats["templates"], stats["seconds"] * 1000,
+    )
+
+
+def post_worker_init(worker):
+    try:
+        with open("/proc/self/status") as fh:
+            rss = next((line.split()[1] for line in fh if line.startswith("VmRSS:")), "?")
+    except OSError:  # не Linux
+        return
+    worker.log.info("Воркер %s готов, RSS %s КБ", worker.pid, rss)
@@ -1,5 +1,6 @@
 #!/usr/bin/env bash
 . /opt/portal/venv/bin/activate
-exec gunicorn portal.wsgi:application \
+cd "$(dirname "$0")"  # gunicorn.conf.py берётся из текущего каталога
+exec gunicorn student_portal.wsgi:application \
      --bind unix:/run/portal.sock \
      --workers 3
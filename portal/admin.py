@@ -14,17 +14,20 @@ class NewsAdmin(admin.ModelAdmin):
     list_display = ("title", "published")
     list_filter = ("published",)
     search_fields = ("title",)
-    readonly_fields = ("published",)       # Поля created/updated нет
+    readonly_fields = ("published", "updated", "source_url")
 
 
 from django.contrib import admin
-from .models import Event, EventRegistration
+from .models import Event, EventRegistration, ImportRun
 
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
-    list_display = ("title", "start_time", "created")
-    readonly_fields = ("created",)
+    list_display = ("title", "start_time", "capacity", "registered_count", "created")
+    readonly_fields = (
+        "created", "updated", "source_url",
+        "guests_count", "participants_count", "organizers_count",
+    )
     search_fields = ("title", "description")
     list_filter = ("start_time",)
     ordering = ("start_time",)
@@ -36,6 +39,27 @@ class EventRegistrationAdmin(admin.ModelAdmin):
     list_filter = ("role",)
     search_fields = ("event__title", "user__username")
 
+    # правки в обход Event.register() — пересчитываем счётчики
+    def save_model(self, request, obj, form, change):
+        old_event_id = (
+            EventRegistration.objects.filter(pk=obj.pk)
+            .values_list("event_id", flat=True).first()
+        )
+        super().save_model(request, obj, form, change)
+        obj.event.recount()
+        if old_event_id and old_event_id != obj.event_id:
+            Event.objects.get(pk=old_event_id).recount()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        obj.event.recount()
+
+    def delete_queryset(self, request, queryset):
+        events = list(Event.objects.filter(registrations__in=queryset).distinct())
+        super().delete_queryset(request, queryset)
+        for event in events:
+            event.recount()
+
 
 @admin.register(Lesson)
 class LessonAdmin(admin.ModelAdmin):
@@ -43,3 +67,13 @@ class LessonAdmin(admin.ModelAdmin):
     list_filter = ("group",)
     search_fields = ("title",)
     autocomplete_fields = ("group",)       # Для ForeignKey
+
+
+@admin.register(ImportRun)
+class ImportRunAdmin(admin.ModelAdmin):
+    list_display = ("started", "kind", "status", "duration", "created", "updated", "errors", "host")
+    list_filter = ("kind", "status")
+    readonly_fields = [f.name for f in ImportRun._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,201 @@
+# portal/assets.py
+"""
+Статика без nginx: хранилище для collectstatic и отдача файлов из самого
+приложения.
+
+* CompressedManifestStorage — ManifestStaticFilesStorage (имена с хэшем
+  содержимого: ``styles.3f2a9c.css``), который рядом с текстовыми файлами
+  кладёт сжатые копии ``.gz`` и ``.br``;
+* StaticFilesMiddleware — отдаёт файлы из STATIC_ROOT до остального стека
+  middleware: сжатую копию по Accept-Encoding, через FileResponse (gunicorn
+  шлёт её sendfile-ом). Файлы с хэшем в имени кэшируются браузером на год
+  (``immutable``), остальные — на минуту.
+
+До collectstatic (разработка, бенчмарки) манифеста нет, и {% static %}
+даёт обычные имена, а middleware пропускает запрос дальше.
+"""
+from __future__ import annotations
+
+import gzip
+import mimetypes
+import os
+import re
+
+import brotli
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+# что имеет смысл сжимать: картинки и шрифты уже сжаты
+COMPRESSIBLE = {".css", ".js", ".map", ".svg", ".txt", ".json", ".xml", ".html", ".ico"}
+MIN_SIZE = 256  # меньше — выигрыш съедят заголовки
+
+# (Content-Encoding, расширение) в порядке предпочтения
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+SHORT = "public, max-age=60"
+
+
+def _compress_gzip(data: bytes) -> bytes:
+    # mtime=0: одинаковый файл на каждом collectstatic
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _compress_br(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+
+COMPRESSORS = {".gz": _compress_gzip, ".br": _compress_br}
+
+
+# ─────────────────────────  collectstatic  ─────────────────
+class CompressedManifestStorage(ManifestStaticFilesStorage):
+    """Хэшированные имена + сжатые копии; без манифеста — обычные URL."""
+
+    def url(self, name, force=False):
+        if not self.hashed_files and not force:
+            return FileSystemStorage.url(self, name)
+        return super().url(name, force)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        # сжимаем и оригиналы, и хэшированные копии: оригиналы нужны тем,
+        # кто ссылается на файл в обход {% static %}
+        names = set(self.hashed_files) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE or not self.exists(name):
+                continue
+            with self.open(name) as fh:
+                data = fh.read()
+            if len(data) < MIN_SIZE:
+                continue
+            for suffix, compress in COMPRESSORS.items():
+                packed = compress(data)
+                if len(packed) >= len(data):
+                    continue
+                target = self.path(name + suffix)
+                with open(target, "wb") as fh:
+                    fh.write(packed)
+                yield name + suffix, name + suffix, True
+
+
+# ─────────────────────────  отдача  ────────────────────────
+class StaticFile:
+    """Файл из STATIC_ROOT и его сжатые копии — заголовки считаются один раз."""
+
+    __slots__ = ("variants", "content_type", "mtime", "last_modified", "etag", "cache_control")
+
+    def __init__(self, path: str, immutable: bool):
+        stat = os.stat(path)
+        self.variants = {None: (path, stat.st_size)}
+        for encoding, suffix in ENCODINGS:
+            try:
+                self.variants[encoding] = (path + suffix, os.stat(path + suffix).st_size)
+            except OSError:
+                pass
+        content_type, _ = mimetypes.guess_type(path)
+        self.content_type = content_type or "application/octet-stream"
+        if self.content_type.startswith("text/") or self.content_type.endswith("javascript"):
+            self.content_type += "; charset=utf-8"
+        self.mtime = stat.st_mtime
+        self.last_modified = http_date(stat.st_mtime)
+        self.etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+        self.cache_control = IMMUTABLE if immutable else SHORT
+
+    def pick(self, accept_encoding: str) -> tuple[str | None, str, int]:
+        for encoding, _ in ENCODINGS:
+            if encoding in self.variants and _accepts(accept_encoding, encoding):
+                return (encoding, *self.variants[encoding])
+        return (None, *self.variants[None])
+
+
+def _accepts(header: str, encoding: str) -> bool:
+    m = re.search(rf"(?:^|,)\s*{encoding}\s*(?:;\s*q=([0-9.]+))?\s*(?:,|$)", header)
+    return bool(m) and (m[1] is None or float(m[1]) > 0)
+
+
+class StaticFilesMiddleware:
+    """Отдать /static/… из STATIC_ROOT, не заходя в остальной стек."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.prefix = "/" + settings.STATIC_URL.lstrip("/")
+        self.root = str(settings.STATIC_ROOT)
+        self.files: dict[str, StaticFile] = {}
+        # хэшированные имена из манифеста: их содержимое под этим именем
+        # никогда не меняется
+        self.immutable = set(getattr(staticfiles_storage, "hashed_files", {}).values())
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.static_response(request)
+        return self.get_response(request) if response is None else response
+
+    async def __acall__(self, request):
+        # файл ищется и открывается в цикле событий: это stat/open с
+        # локального диска, а найденное ещё и кэшируется
+        response = self.static_response(request)
+        return await self.get_response(request) if response is None else response
+
+    def static_response(self, request):
+        if request.method in ("GET", "HEAD") and request.path_info.startswith(self.prefix):
+            return self.serve(request, request.path_info[len(self.prefix):])
+        return None
+
+    def find(self, name: str) -> StaticFile | None:
+        static = self.files.get(name)
+        if static is None:
+            try:
+                path = safe_join(self.root, name)
+            except SuspiciousFileOperation:
+                return None
+            if not os.path.isfile(path):
+                return None
+            # STATIC_ROOT меняется только деплоем (collectstatic + рестарт),
+            # поэтому найденное держим до конца жизни воркера
+            static = self.files[name] = StaticFile(path, name in self.immutable)
+        return static
+
+    def serve(self, request, name: str):
+        static = self.find(name)
+        if static is None:
+            return None
+        encoding, path, size = static.pick(request.headers.get("Accept-Encoding", ""))
+        etag = static.etag if encoding is None else static.etag[:-1] + f'-{encoding}"'
+
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match is not None:
+            not_modified = etag in if_none_match or if_none_match.strip() == "*"
+        else:
+            not_modified = not was_modified_since(
+                request.headers.get("If-Modified-Since"), static.mtime
+            )
+        if not_modified:
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(open(path, "rb"), content_type=static.content_type)
+            response["Content-Length"] = size
+            response.headers.pop("Content-Disposition", None)
+            if encoding:
+                response["Content-Encoding"] = encoding
+        response["ETag"] = etag
+        response["Last-Modified"] = static.last_modified
+        response["Cache-Control"] = static.cache_control
+        if len(static.variants) > 1:
+            response["Vary"] = "Accept-Encoding"
+        return response
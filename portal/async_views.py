@@ -0,0 +1,111 @@
+# portal/async_views.py
+"""
+Async-версии читающих страниц для ASGI: главная, ленты и карточки
+новостей и мероприятий, расписание. Включаются настройкой
+PORTAL_ASYNC_VIEWS (её ставит student_portal/asgi.py, см. urls.py); под
+WSGI остаются синхронные views.py — там async-представление стоило бы
+лишнего цикла событий на каждый запрос.
+
+Классы наследуют синхронные и переиспользуют их логику: всё, что те
+читают из БД или кэша (страница ленты, поколение кэша, регистрация,
+занятия), async get() достаёт заранее через async ORM (aget, afirst,
+async for) и кладёт в cached_property — синхронные get_context_data()
+и content_etag() потом работают без запросов. Шаблон Django рендерит
+в отдельном потоке, как и любой TemplateResponse async-представления.
+"""
+from __future__ import annotations
+
+import inspect
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.template.response import TemplateResponse
+
+from . import cache, views
+from .conditional import AsyncConditionalGetMixin
+
+
+class AsyncViewMixin:
+    """
+    request.user по умолчанию грузится лениво и синхронно — в цикле
+    событий так нельзя, поэтому пользователь (а с ним и сессия) достаётся
+    заранее через request.auser(). Проверки вроде LoginRequiredMixin
+    дальше работают с уже загруженным пользователем.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        response = super().dispatch(request, *args, **kwargs)
+        if inspect.isawaitable(response):
+            response = await response
+        return response
+
+
+class AsyncConditionalPage(AsyncViewMixin, AsyncConditionalGetMixin):
+    """GET через условный запрос: render_page() зовётся, только если нет 304."""
+
+    async def get(self, request, *args, **kwargs):
+        return await self.aconditional_get(request, self.render_page, *args, **kwargs)
+
+
+async def _aget_object(view):
+    """SingleObjectMixin.get_object() по pk на async ORM."""
+    queryset = view.get_queryset()
+    try:
+        return await queryset.aget(pk=view.kwargs["pk"])
+    except queryset.model.DoesNotExist:
+        raise Http404(f"{queryset.model._meta.verbose_name} не найдено")
+
+
+# ─────────────────────────  index  ─────────────────────────
+async def index(request):
+    request.user = await request.auser()
+    return TemplateResponse(request, "portal/index.html", await cache.aindex_payload())
+
+
+# ─────────────────────────  news  ──────────────────────────
+class NewsListView(AsyncConditionalPage, views.NewsListView):
+    async def aprepare_conditional(self, request, *args, **kwargs):
+        self.cache_gen = await cache.ageneration(cache.NEWS)
+
+    async def render_page(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        await self.apaginate_queryset(self.object_list, self.get_paginate_by(self.object_list))
+        return self.render_to_response(self.get_context_data())
+
+
+class NewsDetailView(AsyncConditionalPage, views.NewsDetailView):
+    async def render_page(self, request, *args, **kwargs):
+        self.object = await _aget_object(self)
+        return self.render_to_response(self.get_context_data(object=self.object))
+
+
+# ─────────────────────────  events  ────────────────────────
+class EventListView(AsyncConditionalPage, views.EventListView):
+    async def aprepare_conditional(self, request, *args, **kwargs):
+        self.cache_gen = await cache.ageneration(cache.EVENTS)
+        self.upcoming_first = await views._upcoming_pks().afirst()
+
+    async def render_page(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        await self.apaginate_queryset(self.object_list, self.get_paginate_by(self.object_list))
+        return self.render_to_response(self.get_context_data())
+
+
+class EventDetailView(AsyncConditionalPage, views.EventDetailView):
+    async def render_page(self, request, *args, **kwargs):
+        self.object = await _aget_object(self)
+        if request.user.is_authenticated:
+            self.registration = await self.registration_queryset().afirst()
+        return self.render_to_response(self.get_context_data(object=self.object))
+
+    async def post(self, request, *args, **kwargs):
+        # запись — транзакция с блокировкой строки, оставляем её синхронной
+        return await sync_to_async(super().post)(request, *args, **kwargs)
+
+
+# ─────────────────────────  schedule  ──────────────────────
+class ScheduleView(AsyncViewMixin, views.ScheduleView):
+    async def get(self, request, *args, **kwargs):
+        self.lessons = [lesson async for lesson in self.lessons_queryset()]
+        return self.render_to_response(self.get_context_data(**kwargs))
@@ -0,0 +1,126 @@
+# portal/cache.py
+"""
+Кэш главной страницы и карточек новостей/мероприятий.
+
+Инвалидация через «поколения»: у новостей и мероприятий есть по ключу
+с номером поколения, который меняется в post_save/post_delete
+(см. signals.py) и после массового импорта. Номер входит в ключи
+кэша, поэтому старые записи просто перестают читаться и вытесняются.
+"""
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .routers import replica_may_lag
+
+NEWS = "news"
+EVENTS = "events"
+LESSONS = "lessons"  # занятия и состав групп (личные календари)
+
+# сколько живут записи, если их раньше не инвалидировали сигналы
+TTL = getattr(settings, "PORTAL_CACHE_TTL", 60 * 60)
+
+
+def _gen_key(kind: str) -> str:
+    return f"portal:gen:{kind}"
+
+
+def generation(kind: str) -> int:
+    """Текущее поколение; если ключ вытеснен — заводим новое."""
+    gen = cache.get(_gen_key(kind))
+    if gen is None:
+        cache.add(_gen_key(kind), time.time_ns(), None)
+        gen = cache.get(_gen_key(kind))
+    return gen
+
+
+async def ageneration(kind: str) -> int:
+    """generation() для async-представлений."""
+    gen = await cache.aget(_gen_key(kind))
+    if gen is None:
+        await cache.aadd(_gen_key(kind), time.time_ns(), None)
+        gen = await cache.aget(_gen_key(kind))
+    return gen
+
+
+def generations() -> dict:
+    return {kind: generation(kind) for kind in (NEWS, EVENTS)}
+
+
+def cacheable(*gens: int) -> bool:
+    """
+    Можно ли кэшировать прочитанное под этими поколениями: нет, если
+    запрос читает с реплики, которая могла их ещё не догнать (routers.py).
+    """
+    return not replica_may_lag(max(gens))
+
+
+def bump(*kinds: str) -> None:
+    """Сбросить всё закэшированное для указанных видов контента."""
+    cache.set_many({_gen_key(kind): time.time_ns() for kind in kinds}, None)
+
+
+def _index_key(gens: dict) -> str:
+    return f"portal:index:{gens[NEWS]}:{gens[EVENTS]}"
+
+
+def _index_querysets(now):
+    from .models import Event, News
+
+    return {
+        "upcoming": (
+            Event.objects.filter(start_time__gte=now)
+            .defer("description")
+            .order_by("start_time")[:5]
+        ),
+        "news_list": News.objects.defer("body").order_by("-published")[:5],
+    }
+
+
+def _index_ttl(payload: dict, now) -> int:
+    # запись живёт не дольше начала первого из «ближайших» мероприятий
+    ttl = TTL
+    if payload["upcoming"]:
+        until_start = (payload["upcoming"][0].start_time - now).total_seconds()
+        ttl = max(1, min(ttl, int(until_start)))
+    return ttl
+
+
+def index_payload() -> dict:
+    """
+    Данные главной: 5 ближайших мероприятий и 5 последних новостей.
+    Запись живёт не дольше начала первого из «ближайших» мероприятий —
+    после этого момента оно перестаёт быть предстоящим.
+    """
+    gens = generations()
+    key = _index_key(gens)
+    payload = cache.get(key)
+    if payload is not None:
+        return payload
+
+    now = timezone.now()
+    payload = {name: list(qs) for name, qs in _index_querysets(now).items()}
+    if cacheable(*gens.values()):
+        cache.set(key, payload, _index_ttl(payload, now))
+    return payload
+
+
+async def aindex_payload() -> dict:
+    """index_payload() на async ORM и async API кэша."""
+    gens = {kind: await ageneration(kind) for kind in (NEWS, EVENTS)}
+    key = _index_key(gens)
+    payload = await cache.aget(key)
+    if payload is not None:
+        return payload
+
+    now = timezone.now()
+    payload = {
+        name: [obj async for obj in qs] for name, qs in _index_querysets(now).items()
+    }
+    if cacheable(*gens.values()):
+        await cache.aset(key, payload, _index_ttl(payload, now))
+    return payload
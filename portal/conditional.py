@@ -0,0 +1,98 @@
+# portal/conditional.py
+"""
+Условные GET-запросы (ETag / Last-Modified → 304 без рендера).
+
+Страницы зависят не только от контента, но и от того, кто смотрит
+(имя в шапке, форма записи с CSRF-токеном) — поэтому в ETag входит
+«ключ зрителя». Если в сессии ждут flash-сообщения, страница
+отдаётся целиком.
+"""
+from __future__ import annotations
+
+import hashlib
+
+from django.contrib import messages
+from django.views.decorators.http import condition
+
+
+def viewer_key(request) -> str:
+    user = request.user
+    if not user.is_authenticated:
+        return "anon"
+    # CSRF-секрет меняется при входе — старая страница с формой не годится
+    return ":".join([
+        str(user.pk), user.get_username(), user.get_full_name(),
+        request.META.get("CSRF_COOKIE", ""),
+    ])
+
+
+def make_etag(*parts) -> str:
+    return hashlib.md5(
+        "|".join(str(p) for p in parts).encode(), usedforsecurity=False
+    ).hexdigest()
+
+
+def _has_pending_messages(request) -> bool:
+    return bool(len(messages.get_messages(request)))
+
+
+class ConditionalGetMixin:
+    """
+    Для class-based views: потомок определяет content_etag() и/или
+    content_last_modified() — дешёвые функции без полной выборки данных.
+    По умолчанию (детальные страницы) оба берутся из поля ``updated``
+    объекта self.model одним запросом по pk.
+    Last-Modified отдаётся только анонимам: он не учитывает зрителя.
+    """
+
+    def content_last_modified(self, request, *args, **kwargs):
+        if "pk" not in kwargs:
+            return None
+        if not hasattr(self, "_updated"):
+            self._updated = (
+                self.model.objects.filter(pk=kwargs["pk"])
+                .values_list("updated", flat=True).first()
+            )
+        return self._updated
+
+    def content_etag(self, request, *args, **kwargs):
+        updated = self.content_last_modified(request, *args, **kwargs)
+        if updated is None:
+            return None
+        return f"{self.model._meta.label}:{kwargs['pk']}:{updated.isoformat()}"
+
+    def _etag(self, request, *args, **kwargs):
+        if _has_pending_messages(request):
+            return None
+        tag = self.content_etag(request, *args, **kwargs)
+        return None if tag is None else make_etag(tag, viewer_key(request))
+
+    def _last_modified(self, request, *args, **kwargs):
+        if request.user.is_authenticated or _has_pending_messages(request):
+            return None
+        return self.content_last_modified(request, *args, **kwargs)
+
+    def get(self, request, *args, **kwargs):
+        view = condition(etag_func=self._etag, last_modified_func=self._last_modified)(super().get)
+        return view(request, *args, **kwargs)
+
+
+class AsyncConditionalGetMixin(ConditionalGetMixin):
+    """
+    То же для async-представлений: всё, что content_etag() и
+    content_last_modified() берут из БД или кэша, потомок заранее достаёт
+    в aprepare_conditional() — дальше они считаются без ввода-вывода.
+    """
+
+    async def aprepare_conditional(self, request, *args, **kwargs):
+        if "pk" in kwargs and not hasattr(self, "_updated"):
+            self._updated = await (
+                self.model.objects.filter(pk=kwargs["pk"])
+                .values_list("updated", flat=True).afirst()
+            )
+
+    async def aconditional_get(self, request, handler, *args, **kwargs):
+        """Вызвать async handler или сразу ответить 304/412."""
+        await self.aprepare_conditional(request, *args, **kwargs)
+        view = condition(etag_func=self._etag, last_modified_func=self._last_modified)(handler)
+        return await view(request, *args, **kwargs)
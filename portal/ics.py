@@ -0,0 +1,117 @@
+# portal/ics.py
+"""
+iCalendar-ленты (RFC 5545): публичная — ближайшие мероприятия,
+личная — занятия групп пользователя и его регистрации.
+
+Ленты отдаются потоком (StreamingHttpResponse поверх .iterator()),
+так что память не растёт с числом записей. Личная лента открывается
+по подписанному токену — календарные клиенты не умеют логиниться.
+"""
+from __future__ import annotations
+
+from datetime import timedelta, timezone as dt_tz
+
+from django.core import signing
+from django.utils import timezone
+
+TOKEN_SALT = "portal.calendar"
+LESSON_DURATION = timedelta(minutes=90)  # одна пара
+EVENT_DURATION = timedelta(hours=2)      # если у мероприятия нет end_time
+HISTORY = timedelta(days=90)             # сколько прошлого отдаём в ленте
+
+
+# ─────────────────────────  токены  ────────────────────────
+def user_token(user) -> str:
+    return signing.dumps(user.pk, salt=TOKEN_SALT, compress=True)
+
+
+def user_id_from_token(token: str) -> int | None:
+    try:
+        return int(signing.loads(token, salt=TOKEN_SALT))
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+
+
+# ─────────────────────────  формат  ────────────────────────
+def _escape(text: str) -> str:
+    return (
+        (text or "")
+        .replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Строки длиннее 75 октетов переносятся (CRLF + пробел)."""
+    raw = line.encode()
+    if len(raw) <= 75:
+        return line + "\r\n"
+    parts, start = [], 0
+    while start < len(raw):
+        end = min(start + (75 if not parts else 74), len(raw))
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:  # не режем UTF-8
+            end -= 1
+        parts.append(raw[start:end].decode())
+        start = end
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _dt(value) -> str:
+    return value.astimezone(dt_tz.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def vevent(uid, start, end, summary, description="", url="", location="") -> str:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{_dt(timezone.now())}",
+        f"DTSTART:{_dt(start)}",
+        f"DTEND:{_dt(end)}",
+        f"SUMMARY:{_escape(summary)}",
+    ]
+    if description:
+        lines.append(f"DESCRIPTION:{_escape(description)}")
+    if location:
+        lines.append(f"LOCATION:{_escape(location)}")
+    if url:
+        lines.append(f"URL:{url}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
+
+
+def calendar(name: str, events):
+    """Генератор текста ленты; events — итератор готовых VEVENT-блоков."""
+    yield "".join(_fold(line) for line in (
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//REU Student Portal//RU",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{_escape(name)}",
+        "X-WR-TIMEZONE:Europe/Moscow",
+    ))
+    yield from events
+    yield "END:VCALENDAR\r\n"
+
+
+# ─────────────────────────  содержимое лент  ───────────────
+def event_vevents(events, build_url):
+    for ev in events:
+        yield vevent(
+            f"event-{ev.pk}@portal",
+            ev.start_time,
+            ev.end_time or ev.start_time + EVENT_DURATION,
+            ev.title,
+            description=ev.excerpt,
+            url=build_url(ev),
+        )
+
+
+def lesson_vevents(lessons):
+    for lesson in lessons:
+        yield vevent(
+            f"lesson-{lesson.pk}@portal",
+            lesson.datetime,
+            lesson.datetime + LESSON_DURATION,
+            lesson.title,
+            location=lesson.group.name,
+        )
@@ -0,0 +1,420 @@
+# portal/management/bench.py
+"""
+Общие помощники для команд-бенчмарков (bench_*).
+
+Бенчмарки никогда не трогают рабочую БД: данные генерируются во временной
+тестовой базе, которая удаляется после прогона.
+"""
+from __future__ import annotations
+
+import http.client
+import itertools
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import override_settings
+
+WORDS = (
+    "студент университет совет мероприятие конференция олимпиада лекция "
+    "семинар стипендия общежитие библиотека экономика финансы маркетинг "
+    "менеджмент кафедра факультет практика стажировка форум конкурс "
+    "фестиваль спорт волонтёр наука исследование проект команда победа "
+    "встреча выпускник абитуриент диплом сессия экзамен грант партнёр"
+).split()
+
+# синтетический «словарь» для объёмных данных: реальные слова + псевдослова
+_SYLLABLES = "ка ро ми на те ло ва ри ду пе со ны ги за ле ту".split()
+VOCABULARY = WORDS + [
+    a + b + c for a in _SYLLABLES for b in _SYLLABLES for c in _SYLLABLES
+]
+_ZIPF = list(itertools.accumulate(1 / r for r in range(1, len(VOCABULARY) + 1)))
+
+
+def isolated_caches(cache_dir: str) -> dict:
+    """
+    CACHES с теми же алиасами, но файловыми кэшами в cache_dir: поколения
+    и страницы синтетики не должны попасть в рабочий кэш (ни в файловый,
+    ни в Redis) — иначе портал показал бы их на настоящих данных.
+    """
+    return {
+        alias: {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.path.join(cache_dir, alias),
+            "OPTIONS": dict(conf.get("OPTIONS", {})),
+        }
+        for alias, conf in settings.CACHES.items()
+    }
+
+
+@contextmanager
+def isolated_database(verbosity: int = 0, on_disk: bool = False):
+    """
+    Создать временную тестовую БД (с миграциями) и удалить её по выходу;
+    кэши на это время — во временном каталоге (isolated_caches).
+    on_disk — для SQLite держать базу в файле, а не в памяти: нужно,
+    когда к ней параллельно ходят несколько потоков со своими соединениями.
+    """
+    old_name = connection.settings_dict["NAME"]
+    test = connection.settings_dict.setdefault("TEST", {})
+    old_test_name = test.get("NAME")
+    if connection.vendor == "sqlite":
+        # своя база, не тестовая из settings: прогоны не мешают тестам
+        test["NAME"] = os.path.join(tempfile.gettempdir(), "portal_bench.sqlite3") if on_disk else None
+    with tempfile.TemporaryDirectory() as cache_dir, \
+            override_settings(CACHES=isolated_caches(cache_dir)):
+        connection.creation.create_test_db(verbosity=verbosity, autoclobber=True)
+        try:
+            yield connection
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+            test["NAME"] = old_test_name
+
+
+def lorem(rnd: random.Random, n: int) -> str:
+    """n слов с частотами по закону Ципфа — как в естественном тексте."""
+    return " ".join(rnd.choices(VOCABULARY, cum_weights=_ZIPF, k=n))
+
+
+def percentiles(samples: list[float]) -> dict:
+    """p50/p95/p99/среднее в миллисекундах."""
+    if not samples:
+        return {"n": 0}
+    ms = sorted(s * 1000 for s in samples)
+    pick = lambda p: ms[min(len(ms) - 1, int(round(p / 100 * (len(ms) - 1))))]
+    return {
+        "n": len(ms),
+        "mean": round(statistics.fmean(ms), 3),
+        "p50": round(pick(50), 3),
+        "p95": round(pick(95), 3),
+        "p99": round(pick(99), 3),
+    }
+
+
+def measure(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+# ─────────────────────────  синтетические данные  ──────────
+DEFAULT_SIZES = {
+    "users": 2000,
+    "groups": 40,
+    "lessons_per_group": 300,
+    "events": 2000,
+    "registrations_per_event": 20,
+    "news": 20000,
+}
+
+
+def seed_dataset(sizes: dict, rnd: random.Random, batch_size: int = 2000, log=None) -> dict:
+    """
+    Быстро наполнить БД синтетикой через bulk_create: пользователи
+    с профилями, группы с участниками и занятиями, мероприятия с
+    регистрациями, новости. Возвращает фактические размеры.
+    """
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.db import transaction
+    from django.utils import timezone
+
+    from portal import cache, search
+    from portal.models import (
+        Event, EventRegistration, Lesson, News, Profile, StudyGroup,
+    )
+    from portal.text import first_image, make_excerpt
+
+    User = get_user_model()
+    log = log or (lambda msg: None)
+    now = timezone.now()
+    day = timezone.timedelta(days=1)
+    password = make_password("bench-password")  # хэшируем один раз на всех
+    tag = f"b{time.time_ns() % 10**8}"
+
+    with transaction.atomic():
+        log(f"- пользователи: {sizes['users']}")
+        User.objects.bulk_create(
+            (User(username=f"{tag}_{i}", password=password) for i in range(sizes["users"])),
+            batch_size=batch_size,
+        )
+        user_ids = list(User.objects.filter(username__startswith=f"{tag}_").values_list("pk", flat=True))
+        Profile.objects.bulk_create(
+            (Profile(user_id=pk) for pk in user_ids), batch_size=batch_size,
+        )
+
+        log(f"- группы: {sizes['groups']}, занятий на группу: {sizes['lessons_per_group']}")
+        StudyGroup.objects.bulk_create(
+            StudyGroup(name=f"{tag}-{i:03d}") for i in range(sizes["groups"])
+        )
+        group_ids = list(StudyGroup.objects.filter(name__startswith=f"{tag}-").values_list("pk", flat=True))
+        Membership = StudyGroup.students.through
+        Membership.objects.bulk_create(
+            (Membership(studygroup_id=rnd.choice(group_ids), user_id=pk) for pk in user_ids),
+            batch_size=batch_size,
+        )
+        Lesson.objects.bulk_create(
+            (
+                Lesson(
+                    title=lorem(rnd, 4).capitalize(),
+                    group_id=gid,
+                    datetime=now + day * rnd.uniform(-365, 365),
+                )
+                for gid in group_ids for _ in range(sizes["lessons_per_group"])
+            ),
+            batch_size=batch_size,
+        )
+
+        log(f"- мероприятия: {sizes['events']}")
+
+        def html(n_par):
+            return "".join(f"<p>{lorem(rnd, 40)}</p>" for _ in range(n_par))
+
+        def event(i):
+            description = html(3)
+            return Event(
+                title=f"{lorem(rnd, 5).capitalize()} #{i}",
+                description=description,
+                excerpt=make_excerpt(description),
+                image=first_image(description),
+                start_time=now + day * rnd.uniform(-180, 180),
+                capacity=rnd.choice([None, 50, 100, 500]),
+            )
+
+        events = Event.objects.bulk_create(
+            (event(i) for i in range(sizes["events"])), batch_size=batch_size,
+        )
+        roles = list(EventRegistration.COUNTERS)
+        regs, counters = [], {}
+        for ev in events:
+            k = min(len(user_ids), sizes["registrations_per_event"])
+            if ev.capacity is not None:
+                k = min(k, ev.capacity)
+            for uid in rnd.sample(user_ids, k):
+                role = rnd.choice(roles)
+                regs.append(EventRegistration(event_id=ev.pk, user_id=uid, role=role))
+                counters.setdefault(ev.pk, dict.fromkeys(EventRegistration.COUNTERS.values(), 0))
+                counters[ev.pk][EventRegistration.COUNTERS[role]] += 1
+        EventRegistration.objects.bulk_create(regs, batch_size=batch_size)
+        for ev in events:
+            for field, value in counters.get(ev.pk, {}).items():
+                setattr(ev, field, value)
+        Event.objects.bulk_update(
+            events, list(EventRegistration.COUNTERS.values()), batch_size=batch_size,
+        )
+
+        log(f"- новости: {sizes['news']}")
+
+        def news(i):
+            body = html(3)
+            return News(
+                title=lorem(rnd, 6).capitalize(),
+                body=body,
+                excerpt=make_excerpt(body),
+                published=now - timezone.timedelta(minutes=i * 17),
+            )
+
+        News.objects.bulk_create((news(i) for i in range(sizes["news"])), batch_size=batch_size)
+        search.rebuild(News.objects.all(), batch_size=batch_size)
+
+    # bulk_create не шлёт сигналов — сбрасываем кэш вручную
+    cache.bump(cache.NEWS, cache.EVENTS)
+    return {
+        **sizes,
+        "registrations": len(regs),
+        "lessons": len(group_ids) * sizes["lessons_per_group"],
+        "user_prefix": tag,
+    }
+
+
+# ─────────────────────────  маршруты портала  ──────────────
+# маршруты, которые не имеют смысла гонять GET-ом
+SKIP_ROUTES = {"logout", "timing_stats"}
+
+
+def bench_user():
+    """Пользователь с наибольшим числом занятий и регистраций — «тяжёлый» кабинет."""
+    from django.contrib.auth import get_user_model
+    from django.db.models import Count, OuterRef, Subquery
+    from django.db.models.functions import Coalesce
+
+    from portal.models import EventRegistration, Lesson
+
+    lessons = (
+        Lesson.objects.filter(group__students=OuterRef("pk")).order_by()
+        .values("group__students").annotate(n=Count("pk")).values("n")
+    )
+    registrations = (
+        EventRegistration.objects.filter(user=OuterRef("pk")).order_by()
+        .values("user").annotate(n=Count("pk")).values("n")
+    )
+    return (
+        get_user_model().objects
+        .annotate(weight=Coalesce(Subquery(lessons), 0) + Coalesce(Subquery(registrations), 0))
+        .order_by("-weight", "pk")
+        .first()
+    )
+
+
+def sample_kwargs(user=None) -> dict:
+    """
+    Аргументы маршрутов с параметрами: свежая новость, ближайшее событие
+    и личный календарь user (по умолчанию — bench_user()).
+    """
+    from django.utils import timezone
+
+    from portal import ics
+    from portal.models import Event, News
+
+    news = News.objects.order_by("-published").values_list("pk", flat=True).first()
+    event = (
+        Event.objects.filter(start_time__gte=timezone.now())
+        .order_by("start_time").values_list("pk", flat=True).first()
+    )
+    user = user or bench_user()
+    return {
+        "news_detail": {"pk": news},
+        "event_detail": {"pk": event},
+        "personal_ics": {"token": ics.user_token(user) if user else None},
+    }
+
+
+def portal_routes(kwargs_for: dict):
+    """
+    (имя, путь) всех GET-маршрутов портала. kwargs_for — аргументы для
+    маршрутов с параметрами (<int:pk>, <str:token>); маршрут без них
+    (или с None — в данных нет подходящей записи) пропускается.
+    """
+    from django.urls import URLPattern, reverse
+
+    from portal import urls as portal_urls
+
+    for pattern in portal_urls.urlpatterns:
+        if not isinstance(pattern, URLPattern) or pattern.name in SKIP_ROUTES:
+            continue
+        name = pattern.name
+        kwargs = kwargs_for.get(name) if pattern.pattern.converters else {}
+        if kwargs is None or None in kwargs.values():
+            continue
+        yield name, reverse(f"portal:{name}", kwargs=kwargs)
+
+
+# ─────────────────────────  gunicorn в подпроцессе  ────────
+def http_get(port: int, path: str, headers: dict | None = None) -> tuple[int, float]:
+    """(HTTP-статус, секунды) одного GET на 127.0.0.1 без перехода по редиректам."""
+    started = time.perf_counter()
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        conn.request("GET", path, headers=headers or {})
+        response = conn.getresponse()
+        response.read()
+        return response.status, time.perf_counter() - started
+    finally:
+        conn.close()
+
+
+def process_memory_kb(pid: int) -> dict:
+    """RSS, PSS и USS (собственная память) процесса из /proc/<pid>/smaps_rollup, КБ."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as fh:
+        for line in fh:
+            key, _, rest = line.partition(":")
+            if rest.strip().endswith("kB"):
+                fields[key] = int(rest.split()[0])
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def child_pids(pid: int) -> list[int]:
+    found = []
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # pid (comm) state ppid ...; comm может содержать пробелы
+        if int(stat.rsplit(")", 1)[1].split()[1]) == pid:
+            found.append(int(entry.name))
+    return found
+
+
+def server_memory_kb(pid: int) -> dict:
+    """Память gunicorn: в среднем на воркер и суммарный PSS с мастером."""
+    workers = [process_memory_kb(child) for child in child_pids(pid)]
+    n = max(len(workers), 1)
+    memory = {key: sum(w[key] for w in workers) / n for key in ("rss", "pss", "uss")}
+    memory["workers"] = len(workers)
+    memory["total_pss"] = process_memory_kb(pid)["pss"] + sum(w["pss"] for w in workers)
+    return memory
+
+
+class GunicornServer:
+    """Запущенный gunicorn: pid мастера, порт, секунды до первого ответа."""
+
+    def __init__(self, proc, port: int, ready: float):
+        self.proc, self.port, self.ready = proc, port, ready
+
+    def get(self, path: str, headers: dict | None = None) -> tuple[int, float]:
+        return http_get(self.port, path, headers)
+
+    def memory_kb(self) -> dict:
+        return server_memory_kb(self.proc.pid)
+
+
+@contextmanager
+def gunicorn_server(app: str, env: dict, args: tuple = (), timeout: float = 60):
+    """
+    Запустить gunicorn с настройками проекта (gunicorn.conf.py) на
+    свободном порту 127.0.0.1 и дождаться ответа главной. env дополняет
+    окружение (SQLITE_PATH временной БД, WEB_CONCURRENCY и т. п.).
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "student_portal.settings",
+        "ALLOWED_HOSTS": "127.0.0.1",
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        **env,
+    }
+    with tempfile.TemporaryFile() as log:
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", app, *args],
+            cwd=settings.BASE_DIR, env=env, stdout=log, stderr=log,
+        )
+        try:
+            while True:
+                if proc.poll() is not None:
+                    log.seek(0)
+                    raise RuntimeError("gunicorn завершился:\n" + log.read().decode(errors="replace"))
+                if time.perf_counter() - started > timeout:
+                    raise RuntimeError(f"gunicorn не ответил за {timeout:.0f} с")
+                try:
+                    if http_get(port, "/")[0] == 200:
+                        break
+                except OSError:
+                    pass
+                time.sleep(0.02)
+            yield GunicornServer(proc, port, time.perf_counter() - started)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
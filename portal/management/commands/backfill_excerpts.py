@@ -0,0 +1,23 @@
+"""
+Пересчёт анонсов и картинок у существующих новостей и мероприятий.
+Запуск:
+    python manage.py backfill_excerpts
+"""
+from django.core.management.base import BaseCommand
+
+from portal.models import News, Event
+from portal.text import backfill_derived
+
+
+class Command(BaseCommand):
+    help = "Пересчитать excerpt/image у новостей и мероприятий"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Размер пачки bulk_update")
+
+    def handle(self, *args, **opts):
+        news = backfill_derived(News.objects.all(), "body", opts["batch_size"])
+        events = backfill_derived(Event.objects.all(), "description", opts["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Обновлено: новостей {news}, мероприятий {events}.")
+        )
@@ -0,0 +1,166 @@
+"""
+WSGI против ASGI при одинаковой памяти: одно и то же число воркеров
+gunicorn — синхронных (student_portal.wsgi, views.py) и uvicorn
+(student_portal.asgi, async_views.py). Читающие страницы (главная, ленты,
+карточки, расписание) запрашивает залогиненный студент с растущим числом
+одновременных клиентов; на каждом уровне — запросов в секунду, p50/p95 и
+число ошибок, в конце — память серверов (суммарный PSS).
+
+Сессия — в подписанной cookie (SESSION_BACKEND=signed_cookies): её можно
+выписать здесь же, без общего с сервером хранилища сессий.
+Только SQLite и Linux (/proc).
+Запуск:
+    python manage.py bench_asgi [--workers 2] [--concurrency 1,8,32,64] [--duration 5]
+"""
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from portal.management.bench import (
+    bench_user, gunicorn_server, isolated_database, percentiles, sample_kwargs,
+    seed_dataset,
+)
+
+SIZES = {
+    "users": 300,
+    "groups": 10,
+    "lessons_per_group": 200,
+    "events": 500,
+    "registrations_per_event": 10,
+    "news": 2000,
+}
+SERVERS = {
+    "wsgi": ("student_portal.wsgi:application", ()),
+    "asgi": ("student_portal.asgi:application", ("-k", "uvicorn_worker.UvicornWorker")),
+}
+SIGNED_COOKIES = "django.contrib.sessions.backends.signed_cookies"
+
+
+class Command(BaseCommand):
+    help = "Запросов в секунду и задержки WSGI против ASGI при одинаковом числе воркеров"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Воркеров gunicorn у обоих серверов")
+        parser.add_argument("--concurrency", default="1,8,32,64", help="Уровни одновременных клиентов")
+        parser.add_argument("--duration", type=float, default=5.0, help="Секунд нагрузки на уровень")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        if connection.vendor != "sqlite" or not Path("/proc/self/smaps_rollup").exists():
+            raise CommandError("нужны SQLite и Linux (/proc)")
+        levels = [int(n) for n in opts["concurrency"].split(",")]
+        with isolated_database(on_disk=True):
+            seed_dataset(SIZES, random.Random(opts["seed"]), log=self.stdout.write)
+            user = bench_user()
+            kwargs_for = sample_kwargs(user)
+            paths = [
+                reverse("portal:home"),
+                reverse("portal:news"),
+                reverse("portal:news_detail", kwargs=kwargs_for["news_detail"]),
+                reverse("portal:events"),
+                reverse("portal:event_detail", kwargs=kwargs_for["event_detail"]),
+                reverse("portal:schedule"),
+            ]
+            with override_settings(SESSION_ENGINE=SIGNED_COOKIES):
+                client = Client()
+                client.force_login(user)
+            cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+            db_path = connection.settings_dict["NAME"]
+            connection.close()
+            results = {
+                name: self.run_server(name, db_path, paths, cookie, levels, opts)
+                for name in SERVERS
+            }
+
+        self.stdout.write(
+            f"\n{'клиентов':>8}"
+            + "".join(f" {name + ' зап/с':>11} {'p50':>7} {'p95':>7} {'ошибок':>6}" for name in SERVERS)
+        )
+        for level in levels:
+            line = f"{level:>8}"
+            for name in SERVERS:
+                row = results[name]["levels"][level]
+                line += f" {row['rps']:>11.0f} {row['p50']:>7.1f} {row['p95']:>7.1f} {row['errors']:>6}"
+            self.stdout.write(line)
+        for name in SERVERS:
+            mem = results[name]["memory"]
+            self.stdout.write(
+                f"{name}: {mem['workers']} воркеров, на воркер RSS {mem['rss'] / 1024:.1f} МБ, "
+                f"всего PSS {mem['total_pss'] / 1024:.1f} МБ"
+            )
+
+    def run_server(self, name: str, db_path: str, paths, cookie: str, levels, opts) -> dict:
+        app, args = SERVERS[name]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = {
+                "SQLITE_PATH": db_path,
+                "CACHE_DIR": cache_dir,
+                "SESSION_BACKEND": "signed_cookies",
+                "WEB_CONCURRENCY": str(opts["workers"]),
+                # Server-Timing и агрегат есть в обоих стеках одинаково;
+                # лог медленных запросов под нагрузкой только мешает
+                "SLOW_QUERY_MS": "100000",
+            }
+            try:
+                with gunicorn_server(app, env, args) as server:
+                    headers = {"Cookie": cookie}
+                    for path in paths:
+                        status, _ = server.get(path, headers)
+                        if status != 200:
+                            raise CommandError(f"{name} {path}: HTTP {status}")
+                    rows = {}
+                    for level in levels:
+                        rows[level] = self.load(server, paths, headers, level, opts["duration"])
+                        self.stdout.write(
+                            f"  {name} x{level}: {rows[level]['rps']:.0f} зап/с, "
+                            f"p95 {rows[level]['p95']:.1f} мс"
+                        )
+                    memory = server.memory_kb()
+            except RuntimeError as exc:
+                raise CommandError(str(exc))
+        return {"levels": rows, "memory": memory}
+
+    def load(self, server, paths, headers: dict, clients: int, duration: float) -> dict:
+        """clients потоков шлют запросы по кругу по paths в течение duration секунд."""
+        lock = threading.Lock()
+        samples, errors = [], 0
+        deadline = time.perf_counter() + duration
+
+        def client(n):
+            nonlocal errors
+            mine, failed, i = [], 0, n
+            while time.perf_counter() < deadline:
+                try:
+                    status, elapsed = server.get(paths[i % len(paths)], headers)
+                except OSError:
+                    status, elapsed = 0, 0.0
+                if status == 200:
+                    mine.append(elapsed)
+                else:
+                    failed += 1
+                i += 1
+            with lock:
+                samples.extend(mine)
+                errors += failed
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(clients) as pool:
+            list(pool.map(client, range(clients)))
+        elapsed = time.perf_counter() - started
+        stats = percentiles(samples)
+        return {
+            "rps": len(samples) / elapsed,
+            "p50": stats.get("p50", 0.0),
+            "p95": stats.get("p95", 0.0),
+            "errors": errors,
+        }
@@ -0,0 +1,82 @@
+"""
+Бенчмарк записи импорта: построчный get_or_create/save против пакетного
+upsert (upsert_items из import_rea). Два прогона на каждый путь:
+первичная загрузка и повторная, где изменилась часть записей.
+Данные генерируются во временной БД на диске (чтобы коммиты стоили fsync).
+Запуск:
+    python manage.py bench_import [--records 10000] [--changed 0.1]
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from portal import search
+from portal.management.bench import isolated_database, lorem
+from portal.management.commands.import_rea import content_hash, upsert_items
+from portal.models import News
+
+
+def per_row(items: list[dict]) -> dict:
+    """Прежний путь: SELECT + INSERT/UPDATE с автокоммитом на каждую запись."""
+    stats = {"created": 0, "updated": 0, "unchanged": 0}
+    for data in items:
+        obj, created = News.objects.get_or_create(
+            source_url=data["source_url"], defaults=data
+        )
+        if created:
+            stats["created"] += 1
+        elif obj.content_hash == data["content_hash"]:
+            stats["unchanged"] += 1
+        else:
+            for field, value in data.items():
+                setattr(obj, field, value)
+            obj.save()
+            stats["updated"] += 1
+    return stats
+
+
+class Command(BaseCommand):
+    help = "Сравнить построчную и пакетную запись импортированных новостей"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--records", type=int, default=10_000, help="Сколько записей импортировать")
+        parser.add_argument("--changed", type=float, default=0.1, help="Доля изменившихся при повторе")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        rnd = random.Random(opts["seed"])
+        now = timezone.now()
+
+        def record(i, body):
+            title = f"{lorem(rnd, 6).capitalize()} #{i}"
+            return {
+                "title": title,
+                "body": body,
+                "published": now - timezone.timedelta(minutes=i),
+                "source_url": f"https://bench.invalid/news/{i}",
+                "content_hash": content_hash(title, body),
+            }
+
+        first = [
+            record(i, "".join(f"<p>{lorem(rnd, 40)}</p>" for _ in range(3)))
+            for i in range(opts["records"])
+        ]
+        second = [
+            record(i, data["body"] + "<p>upd</p>") if rnd.random() < opts["changed"] else data
+            for i, data in enumerate(first)
+        ]
+
+        with isolated_database(on_disk=True):
+            for name, write in (("per-row", per_row), ("upsert", lambda items: upsert_items(News, items))):
+                News.objects.all().delete()
+                search.clear_index()
+                for label, items in (("load", first), ("reimport", second)):
+                    t0 = time.perf_counter()
+                    stats = write(items)
+                    elapsed = time.perf_counter() - t0
+                    self.stdout.write(
+                        f"{name:8} {label:9} {elapsed:8.2f} s  "
+                        f"{len(items) / elapsed:9.0f} rec/s  {stats}"
+                    )
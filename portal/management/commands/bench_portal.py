@@ -0,0 +1,132 @@
+"""
+Бенчмарк всех страниц портала: p50/p95/p99 задержки и число SQL-запросов
+по каждому маршруту из portal/urls.py. Запросы идут через тестовый клиент,
+то есть через весь стек middleware.
+
+По умолчанию данные генерируются во временной БД (см. seed_portal);
+--current-db — мерить на уже существующих данных.
+Запуск:
+    python manage.py bench_portal [--requests 50] [--output bench.json] [--compare old.json]
+"""
+import json
+import random
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, setup_test_environment, teardown_test_environment,
+)
+from django.utils import timezone
+
+from portal.management.bench import (
+    DEFAULT_SIZES, bench_user, isolated_database, measure, percentiles,
+    portal_routes, sample_kwargs, seed_dataset,
+)
+from portal.management.commands.seed_portal import add_size_arguments
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+class Command(BaseCommand):
+    help = "Прогнать все маршруты портала и снять p50/p95/p99 и число запросов"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50, help="Запросов на маршрут")
+        parser.add_argument("--output", help="Куда записать результаты (JSON)")
+        parser.add_argument("--compare", help="JSON предыдущего прогона для сравнения")
+        parser.add_argument("--current-db", action="store_true", help="Не генерировать данные, мерить на текущей БД")
+        add_size_arguments(parser)
+
+    def handle(self, *args, **opts):
+        setup_test_environment()
+        try:
+            if opts["current_db"]:
+                result = self.run_all(opts, dataset={"current_db": True})
+            else:
+                sizes = {name: opts[name] for name in DEFAULT_SIZES}
+                with isolated_database():
+                    dataset = seed_dataset(
+                        sizes, random.Random(opts["seed"]), opts["batch_size"],
+                        log=self.stdout.write,
+                    )
+                    result = self.run_all(opts, dataset)
+        finally:
+            teardown_test_environment()
+
+        self.report(result, opts.get("compare"))
+        if opts["output"]:
+            with open(opts["output"], "w", encoding="utf-8") as fh:
+                json.dump(result, fh, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Результаты: {opts['output']}"))
+
+    # ─────────────────────────────────────────────────────────
+    def run_all(self, opts, dataset):
+        user = bench_user()
+        kwargs_for = sample_kwargs(user)
+        # ошибки страниц попадают в отчёт статусом, а не роняют прогон
+        anon = Client(raise_request_exception=False)
+        auth = Client(raise_request_exception=False)
+        if user is not None:
+            auth.force_login(user)
+
+        routes = {}
+        for name, path in portal_routes(kwargs_for):
+            # страницы за логином меряем авторизованным клиентом
+            client = anon
+            if anon.get(path).status_code == 302 and user is not None:
+                client = auth
+
+            with CaptureQueriesContext(connection) as queries:
+                status = client.get(path).status_code
+            n_queries = len(queries)  # до следующих запросов: они чистят queries_log
+            samples = measure(lambda: client.get(path), opts["requests"])
+            routes[name] = {
+                "path": path,
+                "status": status,
+                "auth": client is auth,
+                "queries": n_queries,
+                **percentiles(samples),
+            }
+            self.stdout.write(f"  {name:<16} {routes[name]['p50']:>8} ms p50, {n_queries} SQL")
+
+        return {
+            "commit": _git_commit(),
+            "timestamp": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "dataset": dataset,
+            "requests_per_route": opts["requests"],
+            "routes": routes,
+        }
+
+    def report(self, result, compare_path):
+        previous = {}
+        if compare_path:
+            with open(compare_path, encoding="utf-8") as fh:
+                previous = json.load(fh).get("routes", {})
+
+        self.stdout.write(
+            f"\n{'route':<16} {'HTTP':>4} {'p50':>9} {'p95':>9} {'p99':>9} {'SQL':>5}"
+            + ("   Δp95    ΔSQL" if previous else "")
+        )
+        for name, row in result["routes"].items():
+            line = (
+                f"{name:<16} {row['status']:>4} {row['p50']:>9} {row['p95']:>9} {row['p99']:>9} {row['queries']:>5}"
+            )
+            old = previous.get(name)
+            if old:
+                line += (
+                    f" {row['p95'] - old['p95']:>+8.2f}"
+                    f" {row['queries'] - old['queries']:>+6}"
+                )
+            self.stdout.write(line)
@@ -0,0 +1,183 @@
+"""
+Бенчмарк разбора детальных страниц rea.ru: прежний путь (BeautifulSoup по
+всему документу + select_one + get_text) против extract_article() на lxml
+со скомпилированными XPath. Для каждой страницы — время разбора и прирост
+пикового RSS (разбор в отдельном процессе, нужен Linux /proc).
+
+Страницы — *.html из --pages (имя с «event» — мероприятие, иначе новость),
+например сохранённые с сайта; без --pages генерируются синтетические
+страницы с разметкой как на rea.ru (меню, скрипты, svg, подвал).
+Колонка «совпадает» сравнивает текст и дату.
+Запуск:
+    python manage.py bench_rea_parser [--pages DIR] [--repeat 20]
+"""
+import multiprocessing
+import random
+from pathlib import Path
+
+from bs4 import BeautifulSoup, Tag
+from django.core.management.base import BaseCommand
+
+from portal.management.bench import lorem, measure, percentiles
+from portal.management.commands.import_rea import (
+    EVENT_BODY, EVENT_DATE, NEWS_BODY, NEWS_DATE, extract_article, is_trash,
+)
+from portal.text import plain_text
+
+
+# ─────────────────────────  прежний разбор  ────────────────
+LEGACY_SELECTORS = {
+    "news": (
+        ("div.article__body", "div.news-detail__text", "article"),
+        ".article__date, .news-detail__date", "",
+    ),
+    "event": (
+        ("div.event-detail__text", "div.article__body", "article"),
+        ".event-detail__date, .article__date", " ",
+    ),
+}
+
+
+def legacy_extract(text: str, kind: str) -> tuple[str, str]:
+    body_selectors, date_selector, sep = LEGACY_SELECTORS[kind]
+    art = BeautifulSoup(text, "lxml")
+    node = next(
+        (n for n in (art.select_one(s) for s in body_selectors) if n is not None), art
+    )
+    good = []
+    for el in node.children:
+        if not isinstance(el, Tag) or el.name not in ("p", "h2", "h3", "img"):
+            continue
+        txt = el.get_text(strip=True) if el.name != "img" else ""
+        if is_trash(txt):
+            continue
+        good.append(str(el))
+        if len(good) == 3:
+            break
+    date_node = art.select_one(date_selector)
+    return "".join(good), date_node.get_text(sep, strip=True) if date_node else ""
+
+
+def new_extract(text: str, kind: str) -> tuple[str, str]:
+    if kind == "event":
+        return extract_article(text, EVENT_BODY, EVENT_DATE, " ")
+    return extract_article(text, NEWS_BODY, NEWS_DATE)
+
+
+EXTRACTORS = {"before": legacy_extract, "after": new_extract}
+
+
+# ─────────────────────────  синтетика  ─────────────────────
+def synthetic_page(rnd: random.Random, kind: str, paragraphs: int) -> str:
+    body_cls = "event-detail__text" if kind == "event" else "article__body"
+    date_cls = "event-detail__date" if kind == "event" else "article__date"
+    menu = "".join(
+        f'<li class="menu__item"><a class="menu__link" href="/section/{i}">{lorem(rnd, 2)}</a>'
+        f'<svg viewBox="0 0 24 24"><path d="M{i} 0L24 12L{i} 24z"/></svg></li>'
+        for i in range(400)
+    )
+    scripts = "".join(
+        f"<script>window.__state{i} = {{{', '.join(f'k{j}: {j}' for j in range(200))}}};</script>"
+        for i in range(20)
+    )
+    article = (
+        "<p>Задать вопрос можно, заполнив поля формы</p>"
+        + "".join(
+            f"<p>{lorem(rnd, 60)} <a href='/x'>{lorem(rnd, 2)}</a> {lorem(rnd, 20)}</p>"
+            + (f"<h2>{lorem(rnd, 5)}</h2>" if i % 4 == 3 else "")
+            for i in range(paragraphs)
+        )
+    )
+    footer = "".join(f'<div class="footer__col"><a href="/f/{i}">{lorem(rnd, 3)}</a></div>' for i in range(300))
+    return (
+        f"<!DOCTYPE html><html><head><title>{lorem(rnd, 6)}</title>"
+        f"<style>{'.c{color:red}' * 2000}</style>{scripts}</head><body>"
+        f'<header><nav><ul class="menu">{menu}</ul></nav></header>'
+        f'<main><div class="{date_cls}">{rnd.randint(1, 28)} марта 2025</div>'
+        f'<div class="{body_cls}">{article}</div></main>'
+        f"<footer>{footer}</footer><!-- counters --></body></html>"
+    )
+
+
+def _status_kb(field: str) -> int:
+    with open("/proc/self/status") as fh:
+        for line in fh:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def peak_rss_kb(fn, text: str, kind: str) -> int:
+    """
+    Прирост пикового RSS за один разбор, КБ. Разбор идёт в дочернем
+    процессе; перед ним счётчик пика (VmHWM) сбрасывается через clear_refs.
+    """
+    def child(queue):
+        try:
+            with open("/proc/self/clear_refs", "w") as fh:
+                fh.write("5")
+            before = _status_kb("VmRSS")
+            fn(text, kind)
+            queue.put(_status_kb("VmHWM") - before)
+        except OSError:
+            queue.put(-1)
+
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=child, args=(queue,))
+    proc.start()
+    delta = queue.get()
+    proc.join()
+    return delta
+
+
+class Command(BaseCommand):
+    help = "Сравнить разбор страниц rea.ru: BeautifulSoup против lxml/XPath"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pages", help="Каталог с сохранёнными *.html")
+        parser.add_argument("--repeat", type=int, default=20, help="Повторов на страницу")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        if opts["pages"]:
+            pages = [
+                (p.name, "event" if "event" in p.name else "news", p.read_text(encoding="utf-8"))
+                for p in sorted(Path(opts["pages"]).glob("*.html"))
+            ]
+        else:
+            rnd = random.Random(opts["seed"])
+            pages = [
+                (f"{kind}-{n}.html", kind, synthetic_page(rnd, kind, n))
+                for kind in ("news", "event") for n in (5, 20, 60)
+            ]
+
+        self.stdout.write(
+            f"{'страница':24} {'КБ':>6} {'до, мс':>8} {'после, мс':>10} {'x':>5} "
+            f"{'до, КБ RSS':>11} {'после, КБ RSS':>14}  совпадает"
+        )
+        # память меряем до прогонов на время: освобождённые после них
+        # страницы кучи остаются в RSS и скрыли бы прирост
+        rss = {
+            (name, label): peak_rss_kb(fn, text, kind)
+            for name, kind, text in pages for label, fn in EXTRACTORS.items()
+        }
+        totals = {"before": 0.0, "after": 0.0}
+        for name, kind, text in pages:
+            row = {}
+            for label, fn in EXTRACTORS.items():
+                p50 = percentiles(measure(lambda: fn(text, kind), opts["repeat"]))["p50"]
+                totals[label] += p50
+                row[label] = (p50, rss[name, label])
+            old, new = legacy_extract(text, kind), new_extract(text, kind)
+            same = plain_text(old[0]) == plain_text(new[0]) and old[1] == new[1]
+            self.stdout.write(
+                f"{name[:24]:24} {len(text.encode()) // 1024:6} "
+                f"{row['before'][0]:8.2f} {row['after'][0]:10.2f} "
+                f"{row['before'][0] / max(row['after'][0], 1e-6):5.1f} "
+                f"{row['before'][1]:11} {row['after'][1]:14}  {'да' if same else 'НЕТ'}"
+            )
+        self.stdout.write(
+            f"итого p50: до {totals['before']:.1f} мс, после {totals['after']:.1f} мс "
+            f"(x{totals['before'] / max(totals['after'], 1e-6):.1f})"
+        )
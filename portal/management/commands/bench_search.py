@@ -0,0 +1,61 @@
+"""
+Бенчмарк поиска новостей: icontains против полнотекстового индекса.
+Данные генерируются во временной БД.
+Запуск:
+    python manage.py bench_search [--rows 100000] [--queries 50]
+"""
+import random
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from portal import search
+from portal.management.bench import (
+    VOCABULARY, isolated_database, lorem, measure, percentiles,
+)
+from portal.models import News
+
+
+class Command(BaseCommand):
+    help = "Сравнить задержку поиска icontains и FTS на синтетических новостях"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000, help="Сколько новостей сгенерировать")
+        parser.add_argument("--queries", type=int, default=50, help="Сколько запросов выполнить")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        rnd = random.Random(opts["seed"])
+        with isolated_database():
+            self.stdout.write(f"- Генерирую {opts['rows']} новостей…")
+            now = timezone.now()
+            batch = []
+            for i in range(opts["rows"]):
+                batch.append(News(
+                    title=lorem(rnd, 6).capitalize(),
+                    body="".join(f"<p>{lorem(rnd, 40)}</p>" for _ in range(3)),
+                    published=now - timezone.timedelta(minutes=i),
+                ))
+                if len(batch) == 5000:
+                    News.objects.bulk_create(batch)
+                    batch = []
+            News.objects.bulk_create(batch)
+            search.rebuild(News.objects.all(), batch_size=5000)
+
+            # запросы из 1–2 слов средней частотности
+            terms = [
+                " ".join(rnd.sample(VOCABULARY[10:1000], rnd.randint(1, 2)))
+                for _ in range(opts["queries"])
+            ]
+            qs = News.objects.order_by("-published")
+
+            def run(make_qs):
+                it = iter(terms)
+                return measure(lambda: list(make_qs(next(it))[:10]), len(terms))
+
+            scan = run(lambda q: qs.filter(Q(title__icontains=q) | Q(body__icontains=q)))
+            fts = run(lambda q: search.search_news(qs, q))
+
+        self.stdout.write(f"icontains: {percentiles(scan)}")
+        self.stdout.write(f"fts:       {percentiles(fts)}")
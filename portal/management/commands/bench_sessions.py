@@ -0,0 +1,125 @@
+"""
+Бенчмарк хранилищ сессий: запросов в секунду на /schedule/ и /profile/
+при --sessions разных залогиненных студентах, которые ходят одновременно
+из --threads потоков. Для каждого движка (db, cached_db, cache,
+signed_cookies) — вход всех пользователей, затем по --requests запросов
+на страницу; «SQL сессий» — сколько запросов к django_session пришлось
+на один запрос страницы.
+
+Данные — во временной БД на диске (потокам нужны свои соединения),
+кэши (и кэш сессий) — файловые, во временном каталоге.
+Запуск:
+    python manage.py bench_sessions [--sessions 1000] [--threads 16] [--requests 2000]
+"""
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import (
+    override_settings, setup_test_environment, teardown_test_environment,
+)
+from django.urls import reverse
+
+from portal.management.bench import isolated_database, seed_dataset
+
+ENGINES = ("db", "cached_db", "cache", "signed_cookies")
+PAGES = ("schedule", "profile")
+
+
+class Command(BaseCommand):
+    help = "Запросов в секунду на /schedule/ и /profile/ для разных хранилищ сессий"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sessions", type=int, default=1000, help="Сколько разных пользователей залогинено")
+        parser.add_argument("--threads", type=int, default=16, help="Параллельных потоков")
+        parser.add_argument("--requests", type=int, default=2000, help="Запросов на страницу")
+        parser.add_argument("--engines", default=",".join(ENGINES), help="Какие движки мерить, через запятую")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        sizes = {
+            "users": opts["sessions"],
+            "groups": 20,
+            "lessons_per_group": 200,
+            "events": 300,
+            "registrations_per_event": 10,
+            "news": 1000,
+        }
+        # потоки делят GIL, и под нагрузкой «медленным» становится почти
+        # каждый запрос — лог portal.sql.slow только забил бы отчёт
+        slow_log = logging.getLogger("portal.sql.slow")
+        slow_log.disabled = True
+        setup_test_environment()
+        try:
+            with isolated_database(on_disk=True):
+                seed_dataset(sizes, random.Random(opts["seed"]), log=self.stdout.write)
+                users = list(get_user_model().objects.order_by("pk")[: opts["sessions"]])
+                rows = [
+                    self.bench_engine(engine, users, opts)
+                    for engine in opts["engines"].split(",")
+                ]
+        finally:
+            teardown_test_environment()
+            slow_log.disabled = False
+
+        self.stdout.write(
+            f"\n{'движок':<16} {'вход, /с':>9}"
+            + "".join(f" {name + ', /с':>14} {'SQL сессий':>11}" for name in PAGES)
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['engine']:<16} {row['login']:>9.0f}"
+                + "".join(f" {row[name][0]:>14.0f} {row[name][1]:>11.2f}" for name in PAGES)
+            )
+
+    def run(self, clients, fn, total: int, threads: int) -> tuple[float, float]:
+        """
+        total вызовов fn(client) из threads потоков, клиенты по кругу.
+        Возвращает (вызовов в секунду, запросов к django_session на вызов).
+        """
+        lock = threading.Lock()
+        session_sql = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal session_sql
+            if "django_session" in sql:
+                with lock:
+                    session_sql += 1
+            return execute(sql, params, many, context)
+
+        def work(n):
+            try:
+                with connection.execute_wrapper(count):
+                    for i in range(n, total, threads):
+                        fn(clients[i % len(clients)])
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(work, range(threads)))
+        elapsed = time.perf_counter() - started
+        return total / elapsed, session_sql / total
+
+    def bench_engine(self, engine: str, users, opts) -> dict:
+        with override_settings(SESSION_ENGINE=f"django.contrib.sessions.backends.{engine}"):
+            clients = [Client(raise_request_exception=False) for _ in users]
+            pairs = list(zip(clients, users))
+            login, _ = self.run(pairs, lambda pair: pair[0].force_login(pair[1]), len(pairs), opts["threads"])
+            row = {"engine": engine, "login": login}
+            for name in PAGES:
+                path = reverse(f"portal:{name}")
+                status = clients[0].get(path).status_code
+                if status != 200:
+                    self.stderr.write(f"  {engine} {path}: HTTP {status}")
+                row[name] = self.run(clients, lambda c: c.get(path), opts["requests"], opts["threads"])
+            self.stdout.write(
+                f"  {engine:<16} " + ", ".join(f"{name} {row[name][0]:.0f}/с" for name in PAGES)
+            )
+        return row
@@ -0,0 +1,99 @@
+"""
+Холодный старт gunicorn: прежний ленивый запуск (каждый воркер сам грузит
+Django и шаблоны) против preload + прогрева в мастере (gunicorn.conf.py,
+portal/warmup.py). Для каждого режима:
+
+* время от запуска до первого ответа;
+* первый запрос к каждой странице — сразу --workers параллельных, чтобы
+  досталось каждому воркеру, — и p50 прогретых запросов;
+* память воркеров после трафика: RSS, PSS и собственная (USS) — то, что
+  воркер не делит с мастером.
+
+Данные — во временной БД, кэш страниц — во временном каталоге.
+Только SQLite и Linux (/proc).
+Запуск:
+    python manage.py bench_startup [--workers 3] [--requests 20]
+"""
+import random
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from portal.management.bench import (
+    gunicorn_server, isolated_database, percentiles, portal_routes, sample_kwargs,
+    seed_dataset,
+)
+
+SIZES = {
+    "users": 300,
+    "groups": 10,
+    "lessons_per_group": 100,
+    "events": 300,
+    "registrations_per_event": 10,
+    "news": 1000,
+}
+MODES = {"lazy": "False", "preload": "True"}
+
+
+class Command(BaseCommand):
+    help = "Холодный старт и память воркеров gunicorn: ленивый запуск против preload"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=3, help="Воркеров gunicorn")
+        parser.add_argument("--requests", type=int, default=20, help="Прогретых запросов на страницу")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **opts):
+        if connection.vendor != "sqlite" or not Path("/proc/self/smaps_rollup").exists():
+            raise CommandError("нужны SQLite и Linux (/proc)")
+        with isolated_database(on_disk=True):
+            seed_dataset(SIZES, random.Random(opts["seed"]), log=self.stdout.write)
+            routes = list(portal_routes(sample_kwargs()))
+            db_path = connection.settings_dict["NAME"]
+            connection.close()
+            results = {mode: self.run_mode(mode, db_path, routes, opts) for mode in MODES}
+
+        self.stdout.write(
+            f"\n{'страница':<16}" + "".join(f" {mode + ' 1-й, мс':>16}" for mode in MODES)
+            + f" {'прогретый p50':>14}"
+        )
+        for name, _ in routes:
+            self.stdout.write(
+                f"{name:<16}" + "".join(f" {results[mode]['cold'][name]:>16.1f}" for mode in MODES)
+                + f" {results['preload']['warm'][name]:>14.1f}"
+            )
+        self.stdout.write("")
+        for mode, row in results.items():
+            mem = row["memory"]
+            self.stdout.write(
+                f"{mode:<8} старт {row['ready'] * 1000:7.0f} мс, первые запросы {sum(row['cold'].values()):7.0f} мс; "
+                f"на воркер RSS {mem['rss'] / 1024:5.1f} МБ, PSS {mem['pss'] / 1024:5.1f} МБ, "
+                f"USS {mem['uss'] / 1024:5.1f} МБ; всего PSS {mem['total_pss'] / 1024:5.1f} МБ"
+            )
+
+    def run_mode(self, mode: str, db_path: str, routes, opts) -> dict:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = {
+                "SQLITE_PATH": db_path,
+                "CACHE_DIR": cache_dir,
+                "GUNICORN_PRELOAD": MODES[mode],
+                "WEB_CONCURRENCY": str(opts["workers"]),
+            }
+            try:
+                with gunicorn_server("student_portal.wsgi:application", env) as server:
+                    cold, warm = {}, {}
+                    with ThreadPoolExecutor(opts["workers"]) as pool:
+                        for name, path in routes:
+                            wave = list(pool.map(lambda _: server.get(path), range(opts["workers"])))
+                            cold[name] = max(t for _, t in wave) * 1000
+                    for name, path in routes:
+                        samples = [server.get(path)[1] for _ in range(opts["requests"])]
+                        warm[name] = percentiles(samples)["p50"]
+                    memory = server.memory_kb()
+            except RuntimeError as exc:
+                raise CommandError(str(exc))
+        self.stdout.write(f"  {mode}: старт {server.ready * 1000:.0f} мс, воркеров {memory['workers']}")
+        return {"ready": server.ready, "cold": cold, "warm": warm, "memory": memory}
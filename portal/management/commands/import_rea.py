@@ -1,23 +1,46 @@
 """
 Импорт новостей и мероприятий с сайта rea.ru
 Запуск:
-    python manage.py import_rea [--news 10] [--events 10] [--clear]
+    python manage.py import_rea [--news 10] [--events 10] [--clear] [--full]
+                                [--concurrency 4] [--rate 2]
+                                [--cache-dir DIR] [--cache-size 200]
+                                [--record DIR | --replay DIR]
+                                [--pages 1] [--batch 50] [--checkpoint FILE]
+
+--record сохраняет все загруженные страницы в каталог, --replay потом
+берёт их оттуда без обращения к сети — для профилирования и CI.
+
+Архив целиком (с продолжением после сбоя):
+    python manage.py import_rea --pages 0 --news 100000 --events 100000 \\
+                                --full --checkpoint cache/import_rea.json
 """
 
 from __future__ import annotations
 
 import datetime as dt
+import hashlib
+import json
+import os
 import re
+import tempfile
+import threading
 import time
-from typing import Iterable
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Callable, Iterator
+from urllib.parse import urlsplit
 
 import requests
-from bs4 import BeautifulSoup, Tag
-from django.core.management.base import BaseCommand
+from lxml import etree, html as lxml_html
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from django.utils import timezone
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from portal import cache as portal_cache, search
 from portal.models import News, Event
 
 # ───────────────────  Session с ретраями и заголовками ───────────────────
@@ -37,8 +60,9 @@ retries = Retry(
     backoff_factor=1.5,
     status_forcelist=[429, 500, 502, 503, 504],
 )
-SESSION.mount("https://", HTTPAdapter(max_retries=retries))
-SESSION.mount("http://", HTTPAdapter(max_retries=retries))
+# пул соединений с запасом под параллельные загрузки (--concurrency)
+SESSION.mount("https://", HTTPAdapter(max_retries=retries, pool_maxsize=32))
+SESSION.mount("http://", HTTPAdapter(max_retries=retries, pool_maxsize=32))
 
 # ───────────────────  Словарь месяцев для RU → int ───────────────────────
 MONTHS_RU = {
@@ -57,16 +81,279 @@ MONTHS_RU = {
 }
 
 
+# ───────────────────────────  Ограничение частоты ────────────────────────
+class TokenBucket:
+    """
+    Токен-бакет: в среднем не больше rate запросов в секунду,
+    всплеск — до burst запросов подряд.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """Отдельный токен-бакет на каждый хост."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate, self.burst = rate, burst
+        self.buckets: dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url: str) -> None:
+        if self.rate <= 0:  # 0 — без ограничения
+            return
+        host = urlsplit(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+        bucket.acquire()
+
+
+# ───────────────────────────  Дисковый HTTP-кэш ──────────────────────────
+class HttpCache:
+    """
+    Ответы на диске вместе с ETag/Last-Modified. Повторный запрос идёт
+    с If-None-Match/If-Modified-Since; на 304 отдаём сохранённое тело.
+    Размер ограничен max_bytes, вытесняются давно не читанные (LRU по mtime).
+    """
+
+    def __init__(self, directory, max_bytes: int = 200 * 2**20):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self.lock = threading.Lock()
+        self.stats = {"downloaded": 0, "not_modified": 0, "bytes_downloaded": 0, "bytes_reused": 0}
+        # ключ → (размер, время последнего чтения)
+        self.index: dict[str, tuple[int, float]] = {}
+        for name in os.listdir(self.directory):
+            if name.endswith(".body"):
+                st = os.stat(os.path.join(self.directory, name))
+                self.index[name[:-5]] = (st.st_size, st.st_mtime)
+        self.total = sum(size for size, _ in self.index.values())
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{key}.{ext}")
+
+    def _load(self, key: str):
+        try:
+            with open(self._path(key, "json"), encoding="utf-8") as fh:
+                meta = json.load(fh)
+            with open(self._path(key, "body"), encoding="utf-8") as fh:
+                return meta, fh.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def _write(self, path: str, data: str) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+
+    def _store(self, key: str, url: str, resp) -> None:
+        meta = {
+            "url": url,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+        }
+        self._write(self._path(key, "body"), resp.text)
+        self._write(self._path(key, "json"), json.dumps(meta))
+        size = os.path.getsize(self._path(key, "body"))
+        with self.lock:
+            old_size, _ = self.index.get(key, (0, 0))
+            self.index[key] = (size, time.time())
+            self.total += size - old_size
+            self._evict()
+
+    def _touch(self, key: str) -> None:
+        now = time.time()
+        try:
+            os.utime(self._path(key, "body"), (now, now))
+        except OSError:
+            pass
+        with self.lock:
+            if key in self.index:
+                self.index[key] = (self.index[key][0], now)
+
+    def _evict(self) -> None:
+        """Вызывается под self.lock."""
+        if self.total <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(self.index.items(), key=lambda kv: kv[1][1]):
+            for ext in ("body", "json"):
+                try:
+                    os.remove(self._path(key, ext))
+                except OSError:
+                    pass
+            del self.index[key]
+            self.total -= size
+            if self.total <= self.max_bytes:
+                break
+
+    def get(self, url: str, timeout: int = 60) -> str:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        meta, body = self._load(key)
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        resp = SESSION.get(url, timeout=timeout, headers=headers)
+        if resp.status_code == 304 and body is not None:
+            self._touch(key)
+            with self.lock:
+                self.stats["not_modified"] += 1
+                self.stats["bytes_reused"] += len(body.encode())
+            return body
+        resp.raise_for_status()
+        with self.lock:
+            self.stats["downloaded"] += 1
+            self.stats["bytes_downloaded"] += len(resp.content)
+        if resp.headers.get("ETag") or resp.headers.get("Last-Modified"):
+            self._store(key, url, resp)
+        return resp.text
+
+
+# ───────────────────────────  Снимки страниц  ─────────────────────────────
+class Snapshots:
+    """
+    Каталог сохранённых страниц: <путь-из-URL>-<хэш>.html и index.json
+    (URL → файл, плюс base_url сайта). Имена файлов читаемые, и их же
+    понимает bench_rea_parser --pages.
+    """
+
+    INDEX = "index.json"
+
+    def __init__(self, directory):
+        self.directory = str(directory)
+        self.lock = threading.Lock()
+        try:
+            with open(os.path.join(self.directory, self.INDEX), encoding="utf-8") as fh:
+                index = json.load(fh)
+        except (OSError, ValueError):
+            index = {}
+        self.base_url: str | None = index.get("base_url")
+        self.files: dict[str, str] = index.get("files", {})
+        self.missing = 0
+
+    @staticmethod
+    def _file_name(url: str) -> str:
+        slug = re.sub(r"[^\w.-]+", "_", urlsplit(url).path.strip("/")) or "index"
+        return f"{slug[:80]}-{hashlib.sha1(url.encode()).hexdigest()[:10]}.html"
+
+    def get(self, url: str) -> str:
+        name = self.files.get(url)
+        if name is None:
+            # обычно это упреждающая загрузка за пределом limit
+            with self.lock:
+                self.missing += 1
+            return ""
+        with open(os.path.join(self.directory, name), encoding="utf-8") as fh:
+            return fh.read()
+
+    def put(self, url: str, text: str) -> None:
+        if not text:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        name = self._file_name(url)
+        with open(os.path.join(self.directory, name), "w", encoding="utf-8") as fh:
+            fh.write(text)
+        with self.lock:
+            self.files[url] = name
+
+    def save_index(self, base_url: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, self.INDEX), "w", encoding="utf-8") as fh:
+            json.dump({"base_url": base_url, "files": self.files}, fh, ensure_ascii=False, indent=1)
+
+
+# ───────────────────────────  Контрольная точка  ──────────────────────────
+class Checkpoint:
+    """
+    Прогресс обхода в JSON-файле: для каждого вида записей — страница
+    листинга и URL с неё, уже записанные в БД. Прерванный обход
+    продолжается с этой страницы; завершённый вид из файла удаляется.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                self.state = json.load(fh)
+        except (OSError, ValueError):
+            self.state = {}
+
+    def resume(self, kind: str) -> tuple[int, frozenset]:
+        entry = self.state.get(kind) or {}
+        return entry.get("page", 1), frozenset(entry.get("done", ()))
+
+    def mark(self, kind: str, page: int, urls: list[str]) -> None:
+        """Записи urls со страницы page листинга сохранены в БД."""
+        entry = self.state.get(kind)
+        if entry is None or entry["page"] != page:
+            entry = self.state[kind] = {"page": page, "done": []}
+        entry["done"].extend(urls)
+        self._save()
+
+    def finish(self, kind: str) -> None:
+        if self.state.pop(kind, None) is None:
+            return
+        if self.state:
+            self._save()
+        else:
+            os.remove(self.path)
+
+    def _save(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(self.state, fh, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+
 # ───────────────────────────  Вспомогательные функции ────────────────────
-def fetch(url: str) -> BeautifulSoup:
-    """GET c 60-секундным тайм-аутом и ретраями. При неудаче → пустой BS."""
+def content_hash(*parts: str) -> str:
+    """Отпечаток разобранной страницы: по нему видно, изменилась ли статья."""
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def fetch(
+    url: str,
+    limiter: HostRateLimiter | None = None,
+    cache: HttpCache | None = None,
+) -> str:
+    """GET c 60-секундным тайм-аутом и ретраями. При неудаче → пустая строка."""
     try:
+        if limiter is not None:
+            limiter.acquire(url)
+        if cache is not None:
+            return cache.get(url, timeout=60)
         resp = SESSION.get(url, timeout=60)
         resp.raise_for_status()
-        return BeautifulSoup(resp.text, "lxml")
+        return resp.text
     except requests.RequestException as e:
         print(f"[warn] не смог загрузить {url}: {e}")
-        return BeautifulSoup("", "lxml")
+        return ""
 
 
 def is_trash(text: str) -> bool:
@@ -80,55 +367,261 @@ def is_trash(text: str) -> bool:
     )
 
 
+# ─────────────────────────────  Разбор HTML  ──────────────────────────────
+# Страницы разбираются lxml напрямую (без дерева BeautifulSoup), селекторы
+# скомпилированы один раз. Фолбэки — по порядку, как раньше select_one.
+def _css_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _first(*exprs: str) -> etree.XPath:
+    """Первый в документе узел, подходящий под любое из выражений."""
+    return etree.XPath(f"({' | '.join(exprs)})[1]")
+
+
+NEWS_LINKS = etree.XPath('//a[starts-with(@href, "/news/")]')
+EVENT_LINKS = etree.XPath('//a[starts-with(@href, "/event/") or starts-with(@href, "/events/")]')
+
+NEWS_BODY = (
+    _first(f"//div[{_css_class('article__body')}]"),
+    _first(f"//div[{_css_class('news-detail__text')}]"),
+    _first("//article"),
+)
+NEWS_DATE = _first(f"//*[{_css_class('article__date')} or {_css_class('news-detail__date')}]")
+
+EVENT_BODY = (
+    _first(f"//div[{_css_class('event-detail__text')}]"),
+    _first(f"//div[{_css_class('article__body')}]"),
+    _first("//article"),
+)
+EVENT_DATE = _first(f"//*[{_css_class('event-detail__date')} or {_css_class('article__date')}]")
+
+BODY_TAGS = frozenset(("p", "h2", "h3", "img"))
+DATE_RE = re.compile(r"(\d{1,2})\s+([а-яё]+)(?:\s+(\d{4}))?", re.I)
+
+_HTML_PARSER = lxml_html.HTMLParser(remove_comments=True, remove_pis=True)
+
+
+def parse_html(text: str):
+    """Корень документа; пустая или битая страница → None."""
+    if not text.strip():
+        return None
+    try:
+        return lxml_html.document_fromstring(text, parser=_HTML_PARSER)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def node_text(el, sep: str = "") -> str:
+    """Как get_text(sep, strip=True) у BeautifulSoup."""
+    return sep.join(t.strip() for t in el.itertext() if t.strip())
+
+
+def body_html(node) -> str:
+    """
+    Первые 3 «чистых» прямых дочерних p/h2/h3/img узла. Как и в прежнем
+    разборе, текст img пуст и считается мусором: одиночные картинки
+    отбрасываются (их src относительны rea.ru).
+    """
+    good = []
+    for el in node:
+        if el.tag not in BODY_TAGS:
+            continue
+        if is_trash(node_text(el)):
+            continue
+        good.append(lxml_html.tostring(el, encoding="unicode", with_tail=False))
+        if len(good) == 3:
+            break
+    return "".join(good)
+
+
+def extract_article(text: str, body_xpaths, date_xpath, date_sep: str = "") -> tuple[str, str]:
+    """(HTML начала статьи, текст даты) детальной страницы."""
+    root = parse_html(text)
+    if root is None:
+        return "", ""
+    for xpath in body_xpaths:
+        found = xpath(root)
+        if found:
+            node = found[0]
+            break
+    else:
+        node = root
+    found = date_xpath(root)
+    return body_html(node), node_text(found[0], date_sep) if found else ""
+
+
 # ─────────────────────────────  Парсер rea.ru  ────────────────────────────
 class ReaParser:
-    NEWS_URL = "https://www.rea.ru/news"
-    EVENTS_URL = "https://www.rea.ru/events"
-
-    # ─────────────────────────── Новости ────────────────────────────────
-    def parse_news(self, limit: int = 10) -> Iterable[dict]:
-        soup = fetch(self.NEWS_URL)
-        links = soup.select('a[href^="/news/"]')
-        seen, news = set(), []
-
-        for a in links:
-            href = a["href"]
-            title = a.get_text(" ", strip=True)
-            if not title or title in seen:
+    BASE_URL = "https://www.rea.ru"
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        rate: float = 2.0,
+        base_url: str | None = None,
+        cache: HttpCache | None = None,
+        record: Snapshots | None = None,
+        replay: Snapshots | None = None,
+    ):
+        """
+        concurrency — сколько детальных страниц качаем параллельно;
+        rate — не больше стольких запросов в секунду на хост (0 — без лимита);
+        cache — дисковый HTTP-кэш с ревалидацией (None — без кэша);
+        record/replay — сохранять страницы в снимки / брать их оттуда без сети.
+        """
+        self.cache = cache
+        self.record = record
+        self.replay = replay
+        # для отчёта о пропускной способности
+        self.stats = {"pages": 0, "errors": 0, "parse_time": 0.0}
+        self.lock = threading.Lock()
+        self.base_url = (base_url or self.BASE_URL).rstrip("/")
+        self.NEWS_URL = f"{self.base_url}/news"
+        self.EVENTS_URL = f"{self.base_url}/events"
+        self.concurrency = max(1, concurrency)
+        self.limiter = HostRateLimiter(rate, burst=self.concurrency)
+
+    def fetch(self, url: str) -> str:
+        if self.replay is not None:
+            text = self.replay.get(url)
+        else:
+            text = fetch(url, self.limiter, self.cache)
+            if self.record is not None:
+                self.record.put(url, text)
+        with self.lock:
+            self.stats["pages"] += 1
+            if not text and self.replay is None:
+                self.stats["errors"] += 1
+        return text
+
+    def _timed(self, fn, *args):
+        """Вызвать разбор, прибавив его время к stats (разбор — в основном потоке)."""
+        t0 = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.stats["parse_time"] += time.perf_counter() - t0
+
+    def fetch_many(self, urls: list[str]) -> Iterator[str]:
+        """
+        Загрузить страницы пулом потоков; результаты — в исходном порядке.
+        Вперёд запрашивается не больше concurrency страниц, так что
+        если потребитель остановился (набрал limit), лишнего не качаем.
+        """
+        if not urls:
+            return
+        pool = ThreadPoolExecutor(self.concurrency, thread_name_prefix="rea-fetch")
+        pending: deque = deque()
+        todo = iter(urls)
+        try:
+            for url in todo:
+                pending.append(pool.submit(self.fetch, url))
+                if len(pending) >= self.concurrency:
+                    break
+            while pending:
+                page = pending.popleft().result()
+                for url in todo:
+                    pending.append(pool.submit(self.fetch, url))
+                    break
+                yield page
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _links(self, text: str, xpath: etree.XPath) -> list[tuple[str, str]]:
+        """(заголовок, полный URL) ссылок листинга без повторов."""
+        root = parse_html(text)
+        if root is None:
+            return []
+        seen, links = set(), []
+        for a in xpath(root):
+            title = node_text(a, " ")
+            url = f"{self.base_url}{a.get('href')}"
+            if not title or title in seen or url in seen:
                 continue
-            seen.add(title)
-            full_url = f"https://www.rea.ru{href}"
-
-            art = fetch(full_url)
-            article_node = (
-                art.select_one("div.article__body")
-                or art.select_one("div.news-detail__text")
-                or art.select_one("article")
-                or art
-            )
+            seen.update((title, url))
+            links.append((title, url))
+        return links
 
-            # прямые дочерние p, h2, h3, img
-            elems = [
-                el
-                for el in article_node.children
-                if isinstance(el, Tag) and el.name in ("p", "h2", "h3", "img")
-            ]
-
-            good = []
-            for el in elems:
-                txt = el.get_text(strip=True) if el.name != "img" else ""
-                if is_trash(txt):
-                    continue
-                good.append(str(el))
-                if len(good) == 3:
-                    break
+    @staticmethod
+    def _new_links(links, known: Callable[[list[str]], set[str]] | None):
+        """
+        Листинг идёт от свежих к старым: обрезаем его на первой
+        уже импортированной ссылке. known(urls) → какие из urls уже в базе.
+        """
+        if known is None:
+            return links
+        imported = known([url for _, url in links])
+        for i, (_, url) in enumerate(links):
+            if url in imported:
+                return links[:i]
+        return links
+
+    # ─────────────────────────── Обход листинга ────────────────────────
+    PAGE_PARAM = "PAGEN_1"  # пагинация Bitrix: /news?PAGEN_1=2
+
+    def _listing_url(self, listing: str, page: int) -> str:
+        return listing if page == 1 else f"{listing}?{self.PAGE_PARAM}={page}"
+
+    def _crawl(
+        self,
+        listing: str,
+        xpath: etree.XPath,
+        known: Callable[[list[str]], set[str]] | None,
+        pages: int,
+        start: int = 1,
+        skip: frozenset = frozenset(),
+    ) -> Iterator[tuple[int, str, str, str]]:
+        """
+        Идти по страницам листинга с start и отдавать
+        (номер страницы листинга, заголовок, URL, HTML детальной страницы).
 
-            body_html = "".join(good)
+        pages — сколько страниц листинга пройти (0 — до конца);
+        skip — URL стартовой страницы, уже записанные до прерывания.
+        В памяти держим только текущую и предыдущую страницу листинга.
+        """
+        previous: set[str] = set()
+        page_no = start
+        while not pages or page_no < start + pages:
+            links = self._timed(self._links, self.fetch(self._listing_url(listing, page_no)), xpath)
+            urls = {url for _, url in links}
+            # за последней страницей Bitrix снова отдаёт последнюю
+            if not links or urls <= previous:
+                return
+            previous = urls
+            new_links = self._new_links(links, known)
+            todo = [(t, u) for t, u in new_links if u not in skip or page_no != start]
+            with closing(self.fetch_many([url for _, url in todo])) as details:
+                for (title, url), html in zip(todo, details):
+                    yield page_no, title, url, html
+            if len(new_links) < len(links):  # дошли до уже импортированного
+                return
+            page_no += 1
+
+    # ─────────────────────────── Новости ────────────────────────────────
+    def parse_news(
+        self,
+        limit: int = 10,
+        known: Callable[[list[str]], set[str]] | None = None,
+        pages: int = 1,
+        start: int = 1,
+        skip: frozenset = frozenset(),
+    ) -> Iterator[tuple[int, dict]]:
+        """
+        (номер страницы листинга, новость) — не больше limit записей.
+        known — см. _new_links(): на уже импортированном останавливаемся;
+        pages/start/skip — см. _crawl().
+        """
+        if limit <= 0:
+            return
+        count = 0
+        for page_no, title, full_url, page in self._crawl(
+            self.NEWS_URL, NEWS_LINKS, known, pages, start, skip
+        ):
+            body, date_str = self._timed(extract_article, page, NEWS_BODY, NEWS_DATE)
 
             # дата
-            date_node = art.select_one(".article__date, .news-detail__date")
-            date_str = date_node.get_text(strip=True) if date_node else ""
-            m = re.search(r"(\d{1,2})\s+([а-яё]+)(?:\s+(\d{4}))?", date_str, re.I)
+            m = DATE_RE.search(date_str)
             if m:
                 d, mon_ru, y = int(m[1]), m[2].lower(), m[3]
                 year = int(y) if y else timezone.now().year
@@ -137,68 +630,42 @@ class ReaParser:
             else:
                 published = timezone.now()
 
-            news.append(
-                {
-                    "title": title,
-                    "body": body_html + f"<p><a href='{full_url}' target='_blank'>Читать на rea.ru</a></p>",
-                    "published": published,
-                }
-            )
-            if len(news) >= limit:
-                break
-        return news
+            yield page_no, {
+                "title": title,
+                "body": body + f"<p><a href='{full_url}' target='_blank'>Читать на rea.ru</a></p>",
+                "published": published,
+                "source_url": full_url,
+                "content_hash": content_hash(title, body, date_str),
+            }
+            count += 1
+            if count >= limit:
+                return
 
     # ────────────────────────── Мероприятия ─────────────────────────────
-    # ─────────────────────── EVENTS  ───────────────────────────
-    def parse_events(self, limit: int = 10) -> Iterable[dict]:
+    def parse_events(
+        self,
+        limit: int = 10,
+        known: Callable[[list[str]], set[str]] | None = None,
+        pages: int = 1,
+        start: int = 1,
+        skip: frozenset = frozenset(),
+    ) -> Iterator[tuple[int, dict]]:
         """
         Список ссылок /event/… или /events/…  → детальная страница.
         Берём первые 2-3 «чистых» абзаца, дату, формируем описание.
+        Аргументы — как у parse_news().
         """
-        soup = fetch(self.EVENTS_URL)
-        links = soup.select('a[href^="/event/"], a[href^="/events/"]')
-        print(f"[debug] найдено ссылок мероприятий: {len(links)}")
-
-        seen, events = set(), []
-
-        for a in links:
-            href = a["href"]
-            title = a.get_text(" ", strip=True)
-            if not title or title in seen:
-                continue
-            seen.add(title)
-            full_url = f"https://www.rea.ru{href}"
-
-            # ── детальная страница ─────────────────────────────
-            art = fetch(full_url)
-            node = (
-                    art.select_one("div.event-detail__text")
-                    or art.select_one("div.article__body")
-                    or art.select_one("article")
-                    or art
-            )
-
-            # прямые дети p/h2/h3/img
-            elems = [
-                el for el in node.children
-                if isinstance(el, Tag) and el.name in ("p", "h2", "h3", "img")
-            ]
-
-            good = []
-            for el in elems:
-                txt = el.get_text(strip=True) if el.name != "img" else ""
-                if is_trash(txt):
-                    continue
-                good.append(str(el))
-                if len(good) == 3:
-                    break
-
-            body_html = "".join(good)
+        if limit <= 0:
+            return
+        count = 0
+        for page_no, title, full_url, page in self._crawl(
+            self.EVENTS_URL, EVENT_LINKS, known, pages, start, skip
+        ):
+            body, date_txt = self._timed(extract_article, page, EVENT_BODY, EVENT_DATE, " ")
 
             # ── дата ───────────────────────────────────────────
-            date_node = art.select_one(".event-detail__date, .article__date")
-            date_txt = date_node.get_text(" ", strip=True) if date_node else title
-            m = re.search(r"(\d{1,2})\s+([а-яё]+)(?:\s+(\d{4}))?", date_txt, re.I)
+            date_txt = date_txt or title
+            m = DATE_RE.search(date_txt)
             if not m:
                 print(f"[warn] пропускаю без даты: {full_url}")
                 continue
@@ -207,25 +674,82 @@ class ReaParser:
             month = MONTHS_RU.get(mon_ru, 1)
 
             try:
-                start = dt.datetime(year, month, d,
-                                    tzinfo=timezone.get_default_timezone())
+                start_time = dt.datetime(year, month, d,
+                                         tzinfo=timezone.get_default_timezone())
             except ValueError:
                 print(f"[warn] пропускаю событие с неверной датой: {date_txt} ({full_url})")
                 continue
 
-            events.append(
-                {
-                    "title": title,
-                    "description": body_html + f"<p><a href='{full_url}' target='_blank'>Смотреть на rea.ru</a></p>",
-                    "start_time": start,
-                    "end_time": None,
-                }
+            yield page_no, {
+                "title": title,
+                "description": body + f"<p><a href='{full_url}' target='_blank'>Смотреть на rea.ru</a></p>",
+                "start_time": start_time,
+                "end_time": None,
+                "source_url": full_url,
+                "content_hash": content_hash(title, body, date_txt),
+            }
+            count += 1
+            if count >= limit:
+                return
+
+
+# ──────────────────────────────  Запись в БД  ──────────────────────────────
+def known_urls(model) -> Callable[[list[str]], set[str]]:
+    """Какие из ссылок листинга уже импортированы (один запрос по индексу)."""
+    def known(urls: list[str]) -> set[str]:
+        return set(model.objects.filter(source_url__in=urls).values_list("source_url", flat=True))
+    return known
+
+
+def upsert_items(model, items: list[dict], batch_size: int = 500) -> dict:
+    """
+    Записать разобранные записи пачками в одной транзакции; ключ — source_url.
+    Новые вставляются, изменившиеся (другой content_hash) обновляются одним
+    INSERT … ON CONFLICT DO UPDATE на пачку, совпадающие не трогаются.
+
+    bulk_create обходит save() и сигналы, поэтому excerpt/image и
+    поисковый индекс новостей считаются здесь же.
+    Возвращает {"created": …, "updated": …, "unchanged": …}.
+    """
+    stats = {"created": 0, "updated": 0, "unchanged": 0}
+    # на листинге одна ссылка может встретиться дважды — берём последнюю
+    items = list({data["source_url"]: data for data in items}.values())
+    if not items:
+        return stats
+
+    fields = [f for f in items[0] if f != "source_url"]
+    update_fields = [*fields, "excerpt", "image", "updated"]
+    with transaction.atomic():
+        for i in range(0, len(items), batch_size):
+            batch = items[i:i + batch_size]
+            hashes = dict(
+                model.objects.filter(source_url__in=[d["source_url"] for d in batch])
+                .values_list("source_url", "content_hash")
             )
-            if len(events) >= limit:
-                break
-
-            time.sleep(0.7)  # пауза, чтобы не «ударить» по серверу
-        return events
+            objs = []
+            for data in batch:
+                old = hashes.get(data["source_url"])
+                if old == data["content_hash"]:
+                    stats["unchanged"] += 1
+                    continue
+                stats["created" if old is None else "updated"] += 1
+                obj = model(**data)
+                obj.refresh_derived()
+                objs.append(obj)
+            if not objs:
+                continue
+            model.objects.bulk_create(
+                objs,
+                update_conflicts=True,
+                unique_fields=["source_url"],
+                update_fields=update_fields,
+            )
+            if model is News:
+                search.index_rows(
+                    News.objects.filter(source_url__in=[o.source_url for o in objs])
+                    .values_list("pk", "title", "body")
+                )
+    return stats
 
 
 # ──────────────────────────────  Django command  ───────────────────────────
@@ -236,35 +760,146 @@ class Command(BaseCommand):
         parser.add_argument("--news", type=int, default=10, help="Сколько новостей брать")
         parser.add_argument("--events", type=int, default=10, help="Сколько мероприятий брать")
         parser.add_argument("--clear", action="store_true", help="Очистить импортированные записи перед загрузкой")
+        parser.add_argument(
+            "--full", action="store_true",
+            help="Не останавливаться на уже импортированном: перепроверить весь листинг",
+        )
+        parser.add_argument("--concurrency", type=int, default=4, help="Сколько страниц качать параллельно")
+        parser.add_argument("--rate", type=float, default=2.0, help="Запросов в секунду на хост (0 — без ограничения)")
+        parser.add_argument("--base-url", help=f"Адрес сайта (по умолчанию {ReaParser.BASE_URL}; для локального стенда)")
+        parser.add_argument(
+            "--cache-dir", default=str(settings.BASE_DIR / "cache" / "import_rea"),
+            help="Каталог HTTP-кэша (пустая строка — без кэша)",
+        )
+        parser.add_argument("--cache-size", type=int, default=200, help="Предел HTTP-кэша, МБ")
+        parser.add_argument(
+            "--pages", type=int, default=1,
+            help="Сколько страниц листинга обойти (0 — весь архив)",
+        )
+        parser.add_argument("--batch", type=int, default=50, help="Записей в одной пачке записи в БД")
+        parser.add_argument(
+            "--checkpoint", metavar="FILE",
+            help="Файл прогресса: прерванный обход продолжится с места остановки",
+        )
+        parser.add_argument("--record", metavar="DIR", help="Сохранить загруженные страницы в каталог")
+        parser.add_argument("--replay", metavar="DIR", help="Брать страницы из сохранённого каталога, без сети")
 
     def handle(self, *args, **opts):
-        print("- Проверяю доступность https://www.rea.ru/news ...")
-        test = SESSION.get("https://www.rea.ru/news", timeout=30)
-        print(f"  status={test.status_code}, len={len(test.text)}")
-
+        if opts["record"] and opts["replay"]:
+            raise CommandError("--record и --replay взаимоисключающие")
         if opts["clear"]:
             self.stdout.write("- Удаляем прежние импортированные записи…")
-            News.objects.filter(body__contains="rea.ru").delete()
-            Event.objects.filter(description__contains="rea.ru").delete()
-
-        parser = ReaParser()
-        imported_news = 0
-        imported_events = 0
+            News.objects.filter(source_url__isnull=False).delete()
+            Event.objects.filter(source_url__isnull=False).delete()
+
+        replay = Snapshots(opts["replay"]) if opts["replay"] else None
+        if replay is not None and not replay.files:
+            raise CommandError(f"в {opts['replay']} нет снимков")
+        record = Snapshots(opts["record"]) if opts["record"] else None
+        http_cache = (
+            HttpCache(opts["cache_dir"], opts["cache_size"] * 2**20)
+            if opts["cache_dir"] and replay is None else None
+        )
+        base_url = opts["base_url"] or (replay.base_url if replay else None)
+        parser = ReaParser(
+            opts["concurrency"], opts["rate"], base_url, http_cache, record, replay
+        )
+        incremental = not opts["full"]
+
+        db_time = 0.0
+
+        def timed_db(fn):
+            def wrapper(*args):
+                nonlocal db_time
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args)
+                finally:
+                    db_time += time.perf_counter() - t0
+            return wrapper
+
+        checkpoint = Checkpoint(opts["checkpoint"]) if opts["checkpoint"] else None
+
+        def run(kind, model, parse, limit):
+            """Записывать поток (страница листинга, запись) пачками, отмечая прогресс."""
+            stats = {"created": 0, "updated": 0, "unchanged": 0}
+            start, skip = checkpoint.resume(kind) if checkpoint else (1, frozenset())
+            resumed = start > 1 or bool(skip)
+            if resumed:
+                self.stdout.write(f"- {kind}: продолжаю со страницы листинга {start}")
+            batch = []
+
+            def flush():
+                for key, n in timed_db(upsert_items)(model, [data for _, data in batch]).items():
+                    stats[key] += n
+                if checkpoint is not None:
+                    last = batch[-1][0]
+                    checkpoint.mark(kind, last, [d["source_url"] for p, d in batch if p == last])
+                if record is not None:
+                    record.save_index(parser.base_url)
+                batch.clear()
+
+            # продолженный обход — это недокачанная часть --full: остановка на
+            # уже импортированном сработала бы сразу на записях из skip
+            known = timed_db(known_urls(model)) if incremental and not resumed else None
+            for item in parse(limit, known, opts["pages"], start, skip):
+                batch.append(item)
+                if len(batch) >= opts["batch"]:
+                    flush()
+            if batch:
+                flush()
+            if checkpoint is not None:
+                checkpoint.finish(kind)
+            return stats
+
+        started = time.perf_counter()
 
         # ----------- новости -----------
-        for data in parser.parse_news(opts["news"]):
-            obj, created = News.objects.get_or_create(title=data["title"], defaults=data)
-            if created:
-                imported_news += 1
+        news_stats = run("news", News, parser.parse_news, opts["news"])
 
         # --------- мероприятия ----------
-        for data in parser.parse_events(opts["events"]):
-            obj, created = Event.objects.get_or_create(title=data["title"], defaults=data)
-            if created:
-                imported_events += 1
+        event_stats = run("events", Event, parser.parse_events, opts["events"])
+
+        elapsed = time.perf_counter() - started
+
+        # кэш главной/карточек — записи писались в обход save()
+        portal_cache.bump(portal_cache.NEWS, portal_cache.EVENTS)
+
+        if record is not None:
+            record.save_index(parser.base_url)
+            self.stdout.write(f"- Сохранено снимков: {len(record.files)} в {record.directory}")
+
+        if http_cache is not None:
+            st = http_cache.stats
+            self.stdout.write(
+                f"- HTTP: загружено {st['downloaded']} стр. ({st['bytes_downloaded']} Б), "
+                f"не изменилось {st['not_modified']} стр. ({st['bytes_reused']} Б из кэша)"
+            )
+
+        if replay is not None and replay.missing:
+            self.stdout.write(f"- Нет в снимках: {replay.missing} стр.")
+
+        pages, parse_time = parser.stats["pages"], parser.stats["parse_time"]
+        records = sum(news_stats.values()) + sum(event_stats.values())
+        # для run_importer: call_command() с экземпляром команды
+        self.result = {
+            "news": news_stats,
+            "events": event_stats,
+            "pages": pages,
+            "errors": parser.stats["errors"],
+        }
+        self.stdout.write(
+            f"- Пропускная способность: {pages} стр. за {elapsed:.2f} с "
+            f"({pages / elapsed:.1f} стр/с), {records} записей ({records / elapsed:.1f} зап/с); "
+            f"разбор {parse_time:.2f} с, БД {db_time:.2f} с, "
+            f"загрузка/ожидание {max(0.0, elapsed - parse_time - db_time):.2f} с"
+        )
 
         self.stdout.write(
             self.style.SUCCESS(
-                f"Импорт завершён: новостей добавлено {imported_news}, мероприятий добавлено {imported_events}."
+                f"Импорт завершён: новостей добавлено {news_stats['created']}, "
+                f"обновлено {news_stats['updated']}, без изменений {news_stats['unchanged']}; "
+                f"мероприятий добавлено {event_stats['created']}, "
+                f"обновлено {event_stats['updated']}, без изменений {event_stats['unchanged']}."
             )
         )
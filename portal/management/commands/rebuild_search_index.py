@@ -0,0 +1,21 @@
+"""
+Полная переиндексация новостей для полнотекстового поиска.
+Запуск:
+    python manage.py rebuild_search_index
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from portal import search
+from portal.models import News
+
+
+class Command(BaseCommand):
+    help = "Перестроить полнотекстовый индекс новостей"
+
+    def handle(self, *args, **opts):
+        with transaction.atomic():
+            search.create_index(connection)
+            search.clear_index()
+            total = search.rebuild(News.objects.all())
+        self.stdout.write(self.style.SUCCESS(f"Проиндексировано новостей: {total}"))
@@ -0,0 +1,131 @@
+"""
+Фоновый импорт с rea.ru по расписанию: новости и мероприятия — каждые
+свои N секунд. На каждую задачу берётся блокировка в БД (JobLock), так что
+при нескольких запущенных экземплярах (узлах) импорт идёт только в одном.
+После ошибки повтор откладывается экспоненциально (--retry, 2×, 4×, …,
+не дольше обычного интервала). Каждый запуск пишется в ImportRun.
+Запуск:
+    python manage.py run_importer [--news-every 900] [--events-every 3600]
+                                  [--news 20] [--events 20] [--once]
+"""
+import os
+import signal
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from portal.management.commands.import_rea import Command as ImportCommand
+from portal.models import ImportRun, JobLock
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+class Job:
+    """Задача расписания: вид записей, интервал, время следующего запуска."""
+
+    def __init__(self, kind: str, every: int, limit: int):
+        self.kind, self.every, self.limit = kind, every, limit
+        self.due = time.monotonic()
+        self.failures = 0
+
+    def schedule(self, ok: bool, retry: int) -> None:
+        if ok:
+            self.failures = 0
+            delay = self.every
+        else:
+            self.failures += 1
+            delay = min(self.every, retry * 2 ** (self.failures - 1))
+        self.due = time.monotonic() + delay
+
+
+class Command(BaseCommand):
+    help = "Периодический импорт новостей и мероприятий с блокировкой и журналом запусков"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--news-every", type=int, default=900, help="Интервал импорта новостей, с (0 — не импортировать)")
+        parser.add_argument("--events-every", type=int, default=3600, help="Интервал импорта мероприятий, с (0 — не импортировать)")
+        parser.add_argument("--news", type=int, default=20, help="Сколько новостей брать за запуск")
+        parser.add_argument("--events", type=int, default=20, help="Сколько мероприятий брать за запуск")
+        parser.add_argument("--retry", type=int, default=60, help="Первая пауза после ошибки, с")
+        parser.add_argument("--lock-ttl", type=int, default=1800, help="Срок блокировки, с (дольше самого долгого импорта)")
+        parser.add_argument("--rate", type=float, default=2.0, help="Запросов в секунду на хост")
+        parser.add_argument("--base-url", help="Адрес сайта (для локального стенда)")
+        parser.add_argument("--once", action="store_true", help="Выполнить задачи один раз и выйти (для cron)")
+
+    def handle(self, *args, **opts):
+        owner = f"{socket.gethostname()}:{os.getpid()}"
+        jobs = [
+            Job(kind, opts[f"{kind}_every"], opts[kind])
+            for kind in ("news", "events")
+            if opts[f"{kind}_every"] > 0 and opts[kind] > 0
+        ]
+        if not jobs:
+            return
+        self.stdout.write(f"- Импорт по расписанию ({owner}): " + ", ".join(
+            f"{job.kind} каждые {job.every} с" for job in jobs
+        ))
+        # SIGTERM (systemd, docker stop) — как Ctrl+C: блокировка снимается в run_job
+        previous = signal.signal(signal.SIGTERM, _interrupt)
+        try:
+            while True:
+                for job in jobs:
+                    if job.due <= time.monotonic():
+                        job.schedule(self.run_job(job, owner, opts), opts["retry"])
+                if opts["once"]:
+                    return
+                time.sleep(max(0.0, min(job.due for job in jobs) - time.monotonic()))
+        except KeyboardInterrupt:
+            self.stdout.write("- Остановлено")
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+
+    def run_job(self, job: Job, owner: str, opts) -> bool:
+        """Один запуск импорта; True — успешно (или пропущен из-за блокировки)."""
+        close_old_connections()
+        lock = f"import_rea:{job.kind}"
+        run = ImportRun.objects.create(kind=job.kind, host=owner)
+        started = time.perf_counter()
+        ok = True
+        if not JobLock.acquire(lock, owner, timedelta(seconds=opts["lock_ttl"])):
+            run.status = ImportRun.Status.LOCKED
+        else:
+            try:
+                cmd = ImportCommand(stdout=self.stdout, stderr=self.stderr)
+                call_command(
+                    cmd,
+                    news=job.limit if job.kind == "news" else 0,
+                    events=job.limit if job.kind == "events" else 0,
+                    rate=opts["rate"],
+                    base_url=opts["base_url"],
+                )
+                stats = cmd.result[job.kind]
+                run.created, run.updated, run.unchanged = (
+                    stats["created"], stats["updated"], stats["unchanged"]
+                )
+                run.pages, run.errors = cmd.result["pages"], cmd.result["errors"]
+                # не открылась ни одна страница (даже листинг) — сайт недоступен
+                ok = not (run.errors and run.errors == run.pages)
+                run.status = ImportRun.Status.OK if ok else ImportRun.Status.FAILED
+                if not ok:
+                    run.error = "не удалось загрузить ни одной страницы"
+            except Exception:
+                ok = False
+                run.status = ImportRun.Status.FAILED
+                run.error = traceback.format_exc()
+            finally:
+                JobLock.release(lock, owner)
+
+        run.finished = timezone.now()
+        run.duration = time.perf_counter() - started
+        run.save()
+        line = f"- {job.kind}: {run.get_status_display()} за {run.duration:.1f} с"
+        self.stdout.write(line if ok else self.style.ERROR(line))
+        return ok
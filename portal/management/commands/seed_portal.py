@@ -0,0 +1,36 @@
+"""
+Наполнение текущей БД синтетическими данными для профилирования.
+Запуск:
+    python manage.py seed_portal [--users 2000] [--news 20000] ...
+
+ВНИМАНИЕ: пишет в настроенную БД. Для бенчмарков без побочных
+эффектов используйте bench_portal — он работает во временной базе.
+"""
+import random
+
+from django.core.management.base import BaseCommand
+
+from portal.management.bench import DEFAULT_SIZES, seed_dataset
+
+
+def add_size_arguments(parser):
+    for name, default in DEFAULT_SIZES.items():
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=int, default=default, dest=name,
+        )
+    parser.add_argument("--batch-size", type=int, default=2000, help="Размер пачки bulk_create")
+    parser.add_argument("--seed", type=int, default=1, help="Зерно генератора")
+
+
+class Command(BaseCommand):
+    help = "Сгенерировать пользователей, группы, занятия, мероприятия и новости"
+
+    def add_arguments(self, parser):
+        add_size_arguments(parser)
+
+    def handle(self, *args, **opts):
+        sizes = {name: opts[name] for name in DEFAULT_SIZES}
+        result = seed_dataset(
+            sizes, random.Random(opts["seed"]), opts["batch_size"], log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(f"Готово: {result}"))
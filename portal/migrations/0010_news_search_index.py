@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from portal import search
+
+    search.create_index(schema_editor.connection)
+    News = apps.get_model("portal", "News")
+    rows = News.objects.using(schema_editor.connection.alias).values_list(
+        "pk", "title", "body"
+    )
+    search.index_rows(rows.iterator(), conn=schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from portal import search
+
+    search.drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0009_alter_event_options_alter_profile_options_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
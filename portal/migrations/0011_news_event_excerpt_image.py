@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:18
+
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    from portal.text import backfill_derived
+
+    db = schema_editor.connection.alias
+    backfill_derived(apps.get_model("portal", "News").objects.using(db), "body")
+    backfill_derived(apps.get_model("portal", "Event").objects.using(db), "description")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0010_news_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Анонс'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='image',
+            field=models.CharField(blank=True, editable=False, max_length=500, verbose_name='Картинка'),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Анонс'),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='image',
+            field=models.CharField(blank=True, editable=False, max_length=500, verbose_name='Картинка'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
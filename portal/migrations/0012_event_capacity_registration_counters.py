@@ -0,0 +1,52 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:20
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_registrations(apps, schema_editor):
+    db = schema_editor.connection.alias
+    Event = apps.get_model("portal", "Event")
+    EventRegistration = apps.get_model("portal", "EventRegistration")
+    fields = {
+        "guest": "guests_count",
+        "participant": "participants_count",
+        "organizer": "organizers_count",
+    }
+    rows = (
+        EventRegistration.objects.using(db)
+        .values_list("event_id", "role").annotate(n=Count("pk")).order_by()
+    )
+    for event_id, role, n in rows:
+        Event.objects.using(db).filter(pk=event_id).update(**{fields[role]: n})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0011_news_event_excerpt_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, help_text='Пусто — без ограничения', null=True, verbose_name='Максимум участников'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='guests_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Гостей'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='organizers_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Организаторов'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='participants_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Участников'),
+        ),
+        migrations.RunPython(count_registrations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:30
+
+import re
+
+from django.db import migrations, models
+
+# ссылка, которую import_rea дописывает в конец текста
+SOURCE_LINK_RE = re.compile(r"<a href='([^']+)' target='_blank'>(?:Читать|Смотреть) на rea\.ru</a>")
+
+
+def backfill_source(apps, schema_editor):
+    db = schema_editor.connection.alias
+    for model, field in (("News", "body"), ("Event", "description")):
+        Model = apps.get_model("portal", model)
+        seen = set()
+        for pk, text in Model.objects.using(db).values_list("pk", field).iterator():
+            m = SOURCE_LINK_RE.search(text or "")
+            if m and m[1] not in seen:
+                seen.add(m[1])
+                Model.objects.using(db).filter(pk=pk).update(source_url=m[1])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0013_event_news_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='Хэш содержимого'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='source_url',
+            field=models.URLField(blank=True, max_length=500, null=True, unique=True, verbose_name='Источник'),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='Хэш содержимого'),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='source_url',
+            field=models.URLField(blank=True, max_length=500, null=True, unique=True, verbose_name='Источник'),
+        ),
+        migrations.RunPython(backfill_source, migrations.RunPython.noop),
+    ]
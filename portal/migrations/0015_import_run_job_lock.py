@@ -0,0 +1,50 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0014_news_event_source'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20, verbose_name='Что импортируем')),
+                ('started', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Начало')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Окончание')),
+                ('duration', models.FloatField(blank=True, null=True, verbose_name='Длительность, с')),
+                ('status', models.CharField(choices=[('running', 'Выполняется'), ('ok', 'Успешно'), ('failed', 'Ошибка'), ('locked', 'Пропущен: идёт другой запуск')], default='running', max_length=10, verbose_name='Статус')),
+                ('host', models.CharField(blank=True, max_length=200, verbose_name='Узел')),
+                ('pages', models.PositiveIntegerField(default=0, verbose_name='Страниц')),
+                ('created', models.PositiveIntegerField(default=0, verbose_name='Добавлено')),
+                ('updated', models.PositiveIntegerField(default=0, verbose_name='Обновлено')),
+                ('unchanged', models.PositiveIntegerField(default=0, verbose_name='Без изменений')),
+                ('errors', models.PositiveIntegerField(default=0, verbose_name='Ошибок загрузки')),
+                ('error', models.TextField(blank=True, verbose_name='Текст ошибки')),
+            ],
+            options={
+                'verbose_name': 'Запуск импорта',
+                'verbose_name_plural': 'Запуски импорта',
+                'ordering': ('-started',),
+            },
+        ),
+        migrations.CreateModel(
+            name='JobLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('owner', models.CharField(max_length=200)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Блокировка задачи',
+                'verbose_name_plural': 'Блокировки задач',
+            },
+        ),
+    ]
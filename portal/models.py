@@ -1,9 +1,20 @@
 # portal/models.py
-from django.db import models
+from datetime import timedelta
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Q
 from django.conf import settings
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .text import make_excerpt, first_image
+
+
+def _events_changed():
+    # карточки мероприятий показывают счётчики, а update() не шлёт сигналов
+    from .cache import bump, EVENTS
+    bump(EVENTS)
+
 
 # ─────────────────────────── Мероприятия ────────────────────────────
 class Event(models.Model):
@@ -17,15 +28,121 @@ class Event(models.Model):
         _("Дата и время окончания"), null=True, blank=True
     )
     created     = models.DateTimeField(_("Создано"), auto_now_add=True)
+    updated     = models.DateTimeField(_("Изменено"), auto_now=True)
+
+    capacity    = models.PositiveIntegerField(
+        _("Максимум участников"), null=True, blank=True,
+        help_text=_("Пусто — без ограничения"),
+    )
+
+    # производные от description, пересчитываются в save()
+    excerpt     = models.TextField(_("Анонс"), blank=True, editable=False)
+    image       = models.CharField(_("Картинка"), max_length=500, blank=True, editable=False)
+
+    # счётчики регистраций по ролям; меняются только через register()/unregister()
+    # (они же двигают updated — от него зависит ETag страницы события)
+    guests_count       = models.PositiveIntegerField(_("Гостей"), default=0, editable=False)
+    participants_count = models.PositiveIntegerField(_("Участников"), default=0, editable=False)
+    organizers_count   = models.PositiveIntegerField(_("Организаторов"), default=0, editable=False)
+
+    # заполняются импортом (import_rea); у записей, созданных вручную, пусто
+    source_url   = models.URLField(_("Источник"), max_length=500, null=True, blank=True, unique=True)
+    content_hash = models.CharField(_("Хэш содержимого"), max_length=64, blank=True, editable=False)
 
     class Meta:
         ordering = ["start_time"]
+        indexes = [
+            # лента «ближайшие» и курсорная пагинация (start_time, pk)
+            models.Index(fields=["start_time", "id"], name="portal_event_start_idx"),
+        ]
         verbose_name = _("Мероприятие")
         verbose_name_plural = _("Мероприятия")
 
     def __str__(self):
         return self.title
 
+    # ─── регистрации
+    @property
+    def registered_count(self) -> int:
+        return self.guests_count + self.participants_count + self.organizers_count
+
+    @property
+    def is_full(self) -> bool:
+        return self.capacity is not None and self.registered_count >= self.capacity
+
+    def register(self, user, role) -> bool:
+        """
+        Записать пользователя (или сменить ему роль).
+        False — мест нет. Счётчики меняются одним UPDATE с условием
+        на вместимость, поэтому параллельные запросы не «переполнят» событие.
+        """
+        new_field = EventRegistration.COUNTERS[role]
+        events = Event.objects.filter(pk=self.pk)
+        with transaction.atomic():
+            # блокировка строки события сериализует записи одного пользователя
+            list(events.select_for_update().values_list("pk"))
+            reg = EventRegistration.objects.filter(event=self, user=user).first()
+            if reg is None:
+                has_room = Q(capacity__isnull=True) | Q(
+                    capacity__gt=F("guests_count") + F("participants_count") + F("organizers_count")
+                )
+                if not events.filter(has_room).update(
+                    updated=timezone.now(), **{new_field: F(new_field) + 1}
+                ):
+                    return False
+                EventRegistration.objects.create(event=self, user=user, role=role)
+            elif reg.role != role:
+                old_field = EventRegistration.COUNTERS[reg.role]
+                events.update(
+                    updated=timezone.now(),
+                    **{old_field: F(old_field) - 1, new_field: F(new_field) + 1},
+                )
+                reg.role = role
+                reg.save(update_fields=["role"])
+            transaction.on_commit(_events_changed)
+        return True
+
+    def unregister(self, user) -> bool:
+        """Отменить запись. False — пользователь и не был записан."""
+        with transaction.atomic():
+            list(Event.objects.select_for_update().filter(pk=self.pk).values_list("pk"))
+            reg = EventRegistration.objects.filter(event=self, user=user).first()
+            if reg is None:
+                return False
+            field = EventRegistration.COUNTERS[reg.role]
+            reg.delete()
+            Event.objects.filter(pk=self.pk).update(
+                updated=timezone.now(), **{field: F(field) - 1}
+            )
+            transaction.on_commit(_events_changed)
+        return True
+
+    def recount(self) -> None:
+        """Пересчитать счётчики по таблице регистраций (ремонт после правок в админке)."""
+        counts = dict(
+            self.registrations.values_list("role").annotate(n=Count("pk")).order_by()
+        )
+        values = {
+            field: counts.get(role, 0)
+            for role, field in EventRegistration.COUNTERS.items()
+        }
+        Event.objects.filter(pk=self.pk).update(updated=timezone.now(), **values)
+        for field, value in values.items():
+            setattr(self, field, value)
+        transaction.on_commit(_events_changed)
+
+    def refresh_derived(self):
+        self.excerpt = make_excerpt(self.description)
+        self.image = first_image(self.description)
+
+    def save(self, *args, **kwargs):
+        fields = kwargs.get("update_fields")
+        if fields is None or "description" in fields:
+            self.refresh_derived()
+            if fields is not None:
+                kwargs["update_fields"] = {*fields, "excerpt", "image"}
+        super().save(*args, **kwargs)
+
 
 class EventRegistration(models.Model):
     """
@@ -38,6 +155,13 @@ class EventRegistration(models.Model):
         PARTICIPANT = "participant", _("Участник")
         ORGANIZER   = "organizer",   _("Организатор")
 
+    # роль → поле-счётчик на Event
+    COUNTERS = {
+        Role.GUEST:       "guests_count",
+        Role.PARTICIPANT: "participants_count",
+        Role.ORGANIZER:   "organizers_count",
+    }
+
     event = models.ForeignKey(
         Event,
         verbose_name=_("Мероприятие"),
@@ -98,15 +222,40 @@ class News(models.Model):
         default=timezone.now,
         help_text=_("Будет установлено текущее время"),
     )
+    updated   = models.DateTimeField(_("Изменено"), auto_now=True)
+
+    # производные от body, пересчитываются в save()
+    excerpt   = models.TextField(_("Анонс"), blank=True, editable=False)
+    image     = models.CharField(_("Картинка"), max_length=500, blank=True, editable=False)
+
+    # заполняются импортом (import_rea); у записей, созданных вручную, пусто
+    source_url   = models.URLField(_("Источник"), max_length=500, null=True, blank=True, unique=True)
+    content_hash = models.CharField(_("Хэш содержимого"), max_length=64, blank=True, editable=False)
 
     class Meta:
         ordering = ("-published",)
+        indexes = [
+            # лента новостей и курсорная пагинация (-published, -pk)
+            models.Index(fields=["-published", "-id"], name="portal_news_published_idx"),
+        ]
         verbose_name = _("Новость")
         verbose_name_plural = _("Новости")
 
     def __str__(self):
         return self.title
 
+    def refresh_derived(self):
+        self.excerpt = make_excerpt(self.body)
+        self.image = first_image(self.body)
+
+    def save(self, *args, **kwargs):
+        fields = kwargs.get("update_fields")
+        if fields is None or "body" in fields:
+            self.refresh_derived()
+            if fields is not None:
+                kwargs["update_fields"] = {*fields, "excerpt", "image"}
+        super().save(*args, **kwargs)
+
 
 # ─────────────────────────── Расписание (занятия) ───────────────────
 class Lesson(models.Model):
@@ -124,6 +273,10 @@ class Lesson(models.Model):
 
     class Meta:
         ordering = ("datetime",)
+        indexes = [
+            # расписание группы за неделю/месяц
+            models.Index(fields=["group", "datetime"], name="portal_lesson_group_dt_idx"),
+        ]
         verbose_name = _("Занятие")
         verbose_name_plural = _("Занятия")
 
@@ -149,3 +302,75 @@ class Profile(models.Model):
 
     def __str__(self):
         return f"Profile of {self.user.username}"
+
+
+# ─────────────────────────── Фоновый импорт ─────────────────────────
+class ImportRun(models.Model):
+    """
+    Один запуск импорта из run_importer: длительность, счётчики, ошибка.
+    """
+
+    class Status(models.TextChoices):
+        RUNNING = "running", _("Выполняется")
+        OK      = "ok",      _("Успешно")
+        FAILED  = "failed",  _("Ошибка")
+        LOCKED  = "locked",  _("Пропущен: идёт другой запуск")
+
+    kind      = models.CharField(_("Что импортируем"), max_length=20)
+    started   = models.DateTimeField(_("Начало"), default=timezone.now, db_index=True)
+    finished  = models.DateTimeField(_("Окончание"), null=True, blank=True)
+    duration  = models.FloatField(_("Длительность, с"), null=True, blank=True)
+    status    = models.CharField(
+        _("Статус"), max_length=10, choices=Status.choices, default=Status.RUNNING
+    )
+    host      = models.CharField(_("Узел"), max_length=200, blank=True)
+    pages     = models.PositiveIntegerField(_("Страниц"), default=0)
+    created   = models.PositiveIntegerField(_("Добавлено"), default=0)
+    updated   = models.PositiveIntegerField(_("Обновлено"), default=0)
+    unchanged = models.PositiveIntegerField(_("Без изменений"), default=0)
+    errors    = models.PositiveIntegerField(_("Ошибок загрузки"), default=0)
+    error     = models.TextField(_("Текст ошибки"), blank=True)
+
+    class Meta:
+        ordering = ("-started",)
+        verbose_name = _("Запуск импорта")
+        verbose_name_plural = _("Запуски импорта")
+
+    def __str__(self):
+        return f"{self.kind} {self.started:%d.%m.%Y %H:%M} — {self.get_status_display()}"
+
+
+class JobLock(models.Model):
+    """
+    Блокировка в БД: одна строка на задачу, общая для всех узлов.
+    Просроченную (упавший узел) может перехватить другой владелец.
+    """
+    name       = models.CharField(max_length=100, unique=True)
+    owner      = models.CharField(max_length=200)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _("Блокировка задачи")
+        verbose_name_plural = _("Блокировки задач")
+
+    def __str__(self):
+        return f"{self.name} ({self.owner})"
+
+    @classmethod
+    def acquire(cls, name: str, owner: str, ttl: timedelta) -> bool:
+        """Взять (или продлить свою) блокировку. False — держит кто-то другой."""
+        now = timezone.now()
+        if cls.objects.filter(name=name).filter(
+            Q(expires_at__lt=now) | Q(owner=owner)
+        ).update(owner=owner, expires_at=now + ttl):
+            return True
+        try:
+            with transaction.atomic():
+                cls.objects.create(name=name, owner=owner, expires_at=now + ttl)
+        except IntegrityError:
+            return False
+        return True
+
+    @classmethod
+    def release(cls, name: str, owner: str) -> None:
+        cls.objects.filter(name=name, owner=owner).delete()
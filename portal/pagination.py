@@ -0,0 +1,210 @@
+# portal/pagination.py
+"""
+Keyset-пагинация (по курсору) для длинных лент.
+
+Вместо ``COUNT(*)`` + ``OFFSET n`` страница выбирается условием
+``(поле, id) < (последнее значение, последний id)`` по индексу, поэтому
+сотая страница стоит столько же, сколько первая.
+
+Курсоры — непрозрачные токены ``?after=…`` / ``?before=…``.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.http import Http404
+
+
+def _encode(values) -> str:
+    # isoformat(), а не DjangoJSONEncoder: тот обрезает микросекунды
+    raw = json.dumps(
+        [v.isoformat() if hasattr(v, "isoformat") else v for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(token: str):
+    raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    return json.loads(raw)
+
+
+class KeysetPage:
+    """Страница в духе django.core.paginator.Page, но без номеров."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __repr__(self):
+        return f"<KeysetPage of {len(self)} objects>"
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_token(self):
+        if self._has_next and self.object_list:
+            return self.paginator.token_for(self.object_list[-1])
+        return ""
+
+    @property
+    def previous_token(self):
+        if self._has_previous and self.object_list:
+            return self.paginator.token_for(self.object_list[0])
+        return ""
+
+
+class KeysetPaginator:
+    """
+    ordering — поля сортировки, последнее должно быть уникальным,
+    например ("-published", "-pk") или ("start_time", "pk").
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.object_list = queryset.order_by(*ordering)
+        self.per_page = int(per_page)
+        self.ordering = [
+            (f.lstrip("-"), f.startswith("-")) for f in ordering
+        ]
+
+    # ─── общее число записей считается только по требованию
+    @property
+    def count(self):
+        if not hasattr(self, "_count"):
+            self._count = self.object_list.count()
+        return self._count
+
+    def token_for(self, obj) -> str:
+        return _encode([getattr(obj, name) for name, _ in self.ordering])
+
+    def _cursor_values(self, token):
+        """Токен → значения полей; битый токен → None (первая страница)."""
+        try:
+            values = _decode(token)
+            model = self.object_list.model
+            fields = [
+                model._meta.pk if name == "pk" else model._meta.get_field(name)
+                for name, _ in self.ordering
+            ]
+            if len(values) != len(fields):
+                return None
+            values = [f.to_python(v) for f, v in zip(fields, values)]
+            # to_python(None) → None, а с None условие _seek() не построить
+            return None if None in values else values
+        except (ValueError, TypeError, ValidationError, binascii.Error):
+            return None
+
+    def _seek(self, values, forward: bool) -> Q:
+        """
+        Условие «строго после курсора» в порядке сортировки (или до него):
+        (a > x) OR (a = x AND b > y) OR …
+        """
+        cond = Q()
+        for i, (name, desc) in enumerate(self.ordering):
+            op = "lt" if desc == forward else "gt"
+            term = Q(**{f"{name}__{op}": values[i]})
+            for j, (prev_name, _) in enumerate(self.ordering[:i]):
+                term &= Q(**{prev_name: values[j]})
+            cond |= term
+        return cond
+
+    def _page_query(self, after: str | None, before: str | None):
+        """(выборка на per_page + 1 строк, курсор, листаем ли назад)."""
+        qs = self.object_list
+        size = self.per_page
+        cursor = self._cursor_values(before) if before else None
+        if cursor is not None:
+            reverse = [f"{'' if d else '-'}{n}" for n, d in self.ordering]
+            qs = qs.filter(self._seek(cursor, forward=False)).order_by(*reverse)
+            return qs[: size + 1], cursor, True
+
+        cursor = self._cursor_values(after) if after else None
+        if cursor is not None:
+            qs = qs.filter(self._seek(cursor, forward=True))
+        return qs[: size + 1], cursor, False
+
+    def _make_page(self, rows: list, cursor, backward: bool) -> KeysetPage:
+        size = self.per_page
+        if backward:
+            return KeysetPage(rows[:size][::-1], self, has_next=True, has_previous=len(rows) > size)
+        return KeysetPage(
+            rows[:size], self, has_next=len(rows) > size, has_previous=cursor is not None
+        )
+
+    def page(self, after: str | None = None, before: str | None = None) -> KeysetPage:
+        qs, cursor, backward = self._page_query(after, before)
+        return self._make_page(list(qs), cursor, backward)
+
+    async def apage(self, after: str | None = None, before: str | None = None) -> KeysetPage:
+        qs, cursor, backward = self._page_query(after, before)
+        return self._make_page([row async for row in qs], cursor, backward)
+
+
+class KeysetPaginationMixin:
+    """
+    Подмешивается к ListView: заменяет постраничную навигацию курсорной.
+    Потомок задаёт keyset_ordering и может отключить её через use_keyset().
+    """
+    keyset_ordering: tuple = ("pk",)
+
+    def use_keyset(self) -> bool:
+        return True
+
+    def paginate_queryset(self, queryset, page_size):
+        if getattr(self, "_prefetched_page", None) is not None:
+            return self._prefetched_page
+        if not self.use_keyset():
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+        page = paginator.page(
+            after=self.request.GET.get("after"),
+            before=self.request.GET.get("before"),
+        )
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    async def apaginate_queryset(self, queryset, page_size):
+        """
+        paginate_queryset() для async-представлений: выборка страницы идёт
+        через async ORM, результат запоминается и потом без запросов
+        возвращается из paginate_queryset() внутри get_context_data().
+        """
+        if self.use_keyset():
+            paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+            page = await paginator.apage(
+                after=self.request.GET.get("after"),
+                before=self.request.GET.get("before"),
+            )
+        else:
+            paginator = self.get_paginator(
+                queryset, page_size, orphans=self.get_paginate_orphans(),
+                allow_empty_first_page=self.get_allow_empty(),
+            )
+            paginator.count = await queryset.acount()  # count — cached_property
+            number = self.kwargs.get(self.page_kwarg) or self.request.GET.get(self.page_kwarg) or 1
+            try:
+                page = paginator.page(paginator.num_pages if number == "last" else int(number))
+            except (ValueError, InvalidPage):
+                raise Http404("Нет такой страницы")
+            page.object_list = [obj async for obj in page.object_list]
+        self._prefetched_page = (paginator, page, page.object_list, page.has_other_pages())
+        return self._prefetched_page
@@ -0,0 +1,148 @@
+# portal/routers.py
+"""
+Чтение с реплик, запись — в основную БД.
+
+Реплики — алиасы DATABASES с именами replica1, replica2, … (settings.py
+заводит их из DB_REPLICAS). Без них роутер и middleware ничего не меняют.
+
+* ReplicaRouter — чтения внутри запроса идут на реплику, выбранную на
+  весь запрос (одна страница не собирается из реплик с разным
+  отставанием); вне запросов (команды, импорт, миграции) всё — в default.
+* PrimaryPinMiddleware — прижимает запрос к основной БД, если метод не
+  безопасный (POST и т. п.) или у клиента cookie закрепления — её ставит
+  любой запрос, который что-то записал (запись на мероприятие, правка
+  профиля, вход), на PORTAL_REPLICA_STICKY_SECONDS, так что пользователь
+  видит свои изменения, пока реплики догоняют. Остальные клиенты
+  читают с реплик и сразу после чужих изменений.
+* replica_may_lag() — чтобы страница с отстающей реплики не осела в
+  кэше под новым поколением: пока с изменения контента не прошло то же
+  окно, кэш (главная, фрагменты карточек) с реплик не пополняется, а
+  ETag/Last-Modified у такого ответа снимаются.
+
+Первая запись в запросе прижимает к основной БД и остаток запроса.
+"""
+from __future__ import annotations
+
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_PREFIX = "replica"
+PIN_COOKIE = "db_primary"
+STICKY_SECONDS = getattr(settings, "PORTAL_REPLICA_STICKY_SECONDS", 5)
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def replica_aliases() -> list[str]:
+    return [alias for alias in connections if alias.startswith(REPLICA_PREFIX)]
+
+
+class RequestDB:
+    """Куда читает текущий запрос: алиас реплики или None — в default."""
+    __slots__ = ("read_alias", "wrote", "lagging")
+
+    def __init__(self, read_alias: str | None):
+        self.read_alias = read_alias
+        self.wrote = False
+        self.lagging = False  # прочитанное могло отстать от поколения кэша
+
+
+_current: ContextVar[RequestDB | None] = ContextVar("portal_request_db", default=None)
+
+
+def replica_may_lag(changed_ns: int) -> bool:
+    """
+    Запрос читает с реплики, а контент менялся (changed_ns — time_ns()
+    изменения, т. е. поколение кэша) меньше STICKY_SECONDS назад: реплика
+    может его ещё не видеть, кэшировать прочитанное нельзя.
+    """
+    state = _current.get()
+    if state is None or state.read_alias is None:
+        return False
+    if time.time_ns() - changed_ns < STICKY_SECONDS * 1e9:
+        state.lagging = True
+    return state.lagging
+
+
+
+# ─────────────────────────  router  ────────────────────────
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        return state.read_alias if state is not None else None
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.read_alias = None
+            state.wrote = True
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # реплика — копия default: объекты с неё можно связывать с записываемыми
+        dbs = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in dbs and obj2._state.db in dbs:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # схему на реплики приносит репликация
+        return False if db.startswith(REPLICA_PREFIX) else None
+
+
+# ─────────────────────────  middleware  ────────────────────
+class PrimaryPinMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        replicas = replica_aliases()
+        if not replicas:
+            return self.get_response(request)
+        state = RequestDB(None if self.pinned(request) else random.choice(replicas))
+        token = _current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        replicas = replica_aliases()
+        if not replicas:
+            return await self.get_response(request)
+        state = RequestDB(None if self.pinned(request) else random.choice(replicas))
+        token = _current.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(response, state)
+
+    @staticmethod
+    def pinned(request) -> bool:
+        return request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES
+
+    @staticmethod
+    def finish(response, state: RequestDB):
+        if state.wrote:
+            response.set_cookie(
+                PIN_COOKIE, "1", max_age=STICKY_SECONDS, httponly=True,
+                samesite="Lax", secure=settings.SESSION_COOKIE_SECURE,
+            )
+        if state.lagging:
+            # иначе браузер получал бы 304 на устаревшую страницу до следующего изменения
+            del response["ETag"]
+            del response["Last-Modified"]
+        return response
@@ -0,0 +1,166 @@
+# portal/search.py
+"""
+Полнотекстовый поиск по новостям.
+
+SQLite  → виртуальная таблица FTS5 ``portal_news_fts`` (rowid = News.id);
+Postgres → таблица ``portal_news_search`` с tsvector и GIN-индексом.
+
+В индекс попадают заголовок и текст новости без HTML-тегов.
+Синхронизация — через сигналы post_save/post_delete (см. signals.py).
+На прочих СУБД поиск откатывается к icontains.
+"""
+from __future__ import annotations
+
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+from .text import plain_text
+
+FTS_TABLE = "portal_news_fts"
+PG_TABLE = "portal_news_search"
+PG_CONFIG = "russian"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# ─────────────────────────  util  ──────────────────────────
+def _vendor(conn=None) -> str:
+    return (conn or connection).vendor
+
+
+def _fts_query(q: str) -> str:
+    """
+    Пользовательский ввод → безопасный запрос FTS5.
+    Каждое слово ищется как префикс, слова объединяются через AND.
+    """
+    return " ".join(f'"{w}"*' for w in _WORD_RE.findall(q))
+
+
+# ─────────────────────────  DDL  ───────────────────────────
+def create_index(conn) -> None:
+    """Создать структуры поиска (вызывается из миграции)."""
+    with conn.cursor() as cur:
+        if _vendor(conn) == "sqlite":
+            cur.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                "USING fts5(title, body, tokenize='unicode61 remove_diacritics 2')"
+            )
+        elif _vendor(conn) == "postgresql":
+            cur.execute(
+                f"CREATE TABLE IF NOT EXISTS {PG_TABLE} ("
+                " news_id bigint PRIMARY KEY"
+                "   REFERENCES portal_news(id) ON DELETE CASCADE,"
+                " document tsvector NOT NULL)"
+            )
+            cur.execute(
+                f"CREATE INDEX IF NOT EXISTS {PG_TABLE}_document_gin "
+                f"ON {PG_TABLE} USING gin (document)"
+            )
+
+
+def clear_index(conn=None) -> None:
+    with (conn or connection).cursor() as cur:
+        if _vendor(conn) == "sqlite":
+            cur.execute(f"DELETE FROM {FTS_TABLE}")
+        elif _vendor(conn) == "postgresql":
+            cur.execute(f"DELETE FROM {PG_TABLE}")
+
+
+def drop_index(conn) -> None:
+    with conn.cursor() as cur:
+        if _vendor(conn) == "sqlite":
+            cur.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        elif _vendor(conn) == "postgresql":
+            cur.execute(f"DROP TABLE IF EXISTS {PG_TABLE}")
+
+
+# ─────────────────────────  синхронизация  ─────────────────
+def index_rows(rows, conn=None) -> None:
+    """
+    Проиндексировать пачку новостей.
+    rows — итерируемое из кортежей (id, title, body_html).
+    """
+    conn = conn or connection
+    params = [(pk, title, plain_text(body)) for pk, title, body in rows]
+    if not params:
+        return
+    with conn.cursor() as cur:
+        if _vendor(conn) == "sqlite":
+            cur.executemany(
+                f"DELETE FROM {FTS_TABLE} WHERE rowid = %s",
+                [(pk,) for pk, _, _ in params],
+            )
+            cur.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, body) VALUES (%s, %s, %s)",
+                params,
+            )
+        elif _vendor(conn) == "postgresql":
+            cur.executemany(
+                f"INSERT INTO {PG_TABLE} (news_id, document) VALUES (%s, "
+                f"setweight(to_tsvector('{PG_CONFIG}', %s), 'A') || "
+                f"setweight(to_tsvector('{PG_CONFIG}', %s), 'B')) "
+                "ON CONFLICT (news_id) DO UPDATE SET document = EXCLUDED.document",
+                params,
+            )
+
+
+def index_news(news) -> None:
+    index_rows([(news.pk, news.title, news.body)])
+
+
+def unindex_news(pk: int) -> None:
+    with connection.cursor() as cur:
+        if _vendor() == "sqlite":
+            cur.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [pk])
+        elif _vendor() == "postgresql":
+            cur.execute(f"DELETE FROM {PG_TABLE} WHERE news_id = %s", [pk])
+
+
+def rebuild(queryset: QuerySet, batch_size: int = 1000) -> int:
+    """Переиндексировать все новости queryset-а. Возвращает число строк."""
+    total, batch = 0, []
+    for row in queryset.values_list("pk", "title", "body").iterator(batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            index_rows(batch)
+            total += len(batch)
+            batch = []
+    index_rows(batch)
+    return total + len(batch)
+
+
+# ─────────────────────────  поиск  ─────────────────────────
+def search_news(queryset: QuerySet, q: str) -> QuerySet:
+    """
+    Отфильтровать новости по запросу q и отсортировать по релевантности
+    (при равной релевантности — более свежие выше).
+    """
+    if _vendor() == "sqlite":
+        match = _fts_query(q)
+        if not match:
+            return queryset.none()
+        params = [match]
+        found = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+        # bm25(): меньше — лучше; заголовок весит вдвое больше текста
+        rank = (
+            f"SELECT -bm25({FTS_TABLE}, 2.0, 1.0) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s AND rowid = portal_news.id"
+        )
+    elif _vendor() == "postgresql":
+        params = [q]
+        tsquery = f"websearch_to_tsquery('{PG_CONFIG}', %s)"
+        found = f"SELECT news_id FROM {PG_TABLE} WHERE document @@ {tsquery}"
+        rank = f"SELECT ts_rank(document, {tsquery}) FROM {PG_TABLE} WHERE news_id = portal_news.id"
+    else:
+        return queryset.filter(Q(title__icontains=q) | Q(body__icontains=q))
+
+    # совпадения берутся из индекса одним подзапросом, ранг — по rowid/news_id
+    # только для найденных строк
+    return (
+        queryset.filter(pk__in=RawSQL(found, params))
+        .annotate(rank=RawSQL(f"({rank})", params, output_field=FloatField()))
+        .order_by("-rank", "-published", "-pk")
+    )
@@ -1,10 +1,78 @@
 # portal/signals.py
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.backends.signals import connection_created
+from django.db import connections
+from django.db.models.signals import post_migrate, post_save, post_delete, m2m_changed
 from django.dispatch import receiver
-from .models import Profile
+from . import cache, search
+from .models import Profile, News, Event, Lesson, StudyGroup
+
+# ─── настройки SQLite на каждое новое соединение; файл они не меняют
+SQLITE_PRAGMAS = (
+    "mmap_size=268435456",    # 256 МБ файла читаются через mmap
+    "busy_timeout=20000",     # ждать блокировку 20 с, а не падать «database is locked»
+    "temp_store=MEMORY",
+)
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cur:
+        for pragma in SQLITE_PRAGMAS:
+            cur.execute(f"PRAGMA {pragma}")
+        cur.execute("PRAGMA journal_mode")
+        if cur.fetchone()[0] == "wal":
+            cur.execute("PRAGMA synchronous=NORMAL")  # в WAL безопасно; fsync только на checkpoint
+
+
+# ─── WAL: читатели не ждут писателя, писатель — читателей. Режим хранится
+# в самом файле, поэтому включается один раз — после migrate (деплой,
+# docker-compose), а не на каждом соединении: иначе любая команда вроде
+# `manage.py check` переписывала бы db.sqlite3
+@receiver(post_migrate)
+def enable_sqlite_wal(sender, using, **kwargs):
+    if sender.name != "portal":
+        return
+    connection = connections[using]
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cur:
+            cur.execute("PRAGMA journal_mode=WAL")
+
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
-        Profile.objects.create(user=instance)
\ No newline at end of file
+        Profile.objects.create(user=instance)
+
+
+# ─── полнотекстовый индекс новостей
+@receiver(post_save, sender=News)
+def index_news(sender, instance, update_fields=None, **kwargs):
+    # save(update_fields=...) без заголовка и текста индекс не меняет
+    if update_fields is not None and not {"title", "body"} & update_fields:
+        return
+    search.index_news(instance)
+
+
+@receiver(post_delete, sender=News)
+def unindex_news(sender, instance, **kwargs):
+    search.unindex_news(instance.pk)
+
+
+# ─── кэш главной и карточек
+@receiver([post_save, post_delete], sender=News)
+def invalidate_news_cache(sender, **kwargs):
+    cache.bump(cache.NEWS)
+
+
+@receiver([post_save, post_delete], sender=Event)
+def invalidate_events_cache(sender, **kwargs):
+    cache.bump(cache.EVENTS)
+
+
+@receiver([post_save, post_delete], sender=Lesson)
+@receiver(m2m_changed, sender=StudyGroup.students.through)
+def invalidate_lessons_cache(sender, **kwargs):
+    cache.bump(cache.LESSONS)
@@ -0,0 +1,9 @@
+# portal/tests
+"""
+Тесты портала: `python manage.py test` (так же их запускает CI).
+
+Кэши тестам подменяются на память процесса (TEST_CACHES): поколения и
+страницы тестовых данных не должны попасть в рабочий кэш.
+"""
+LOCMEM = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+TEST_CACHES = {"default": LOCMEM, "sessions": LOCMEM}
@@ -0,0 +1,92 @@
+"""
+Загрузка страниц импортом (import_rea: TokenBucket, HostRateLimiter,
+ReaParser.fetch_many) против локального HTTP-сервера, который отвечает
+с задержкой: порядок результатов, предел параллельных запросов и
+частота по rate.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase
+
+from portal.management.commands.import_rea import ReaParser
+
+DELAY = 0.1  # секунд на ответ
+
+
+@contextmanager
+def slow_server():
+    """Сервер на свободном порту: тело ответа — путь запроса. Отдаёт статистику."""
+    stats = {"in_flight": 0, "max_in_flight": 0, "requests": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                stats["requests"] += 1
+                stats["in_flight"] += 1
+                stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+            try:
+                # нечётные страницы быстрее: ответы приходят не по порядку
+                n = int(self.path.rsplit("/", 1)[-1])
+                time.sleep(DELAY / 4 if n % 2 else DELAY)
+                body = self.path.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            finally:
+                with lock:
+                    stats["in_flight"] -= 1
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}", stats
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+class FetchManyTests(SimpleTestCase):
+    def fetch_all(self, count: int, **parser_kwargs):
+        """(страницы, секунд, статистика сервера) для count страниц подряд."""
+        with slow_server() as (base, stats):
+            parser = ReaParser(base_url=base, **parser_kwargs)
+            urls = [f"{base}/page/{i}" for i in range(count)]
+            started = time.perf_counter()
+            pages = list(parser.fetch_many(urls))
+            elapsed = time.perf_counter() - started
+        self.assertEqual(parser.stats["errors"], 0)
+        return pages, elapsed, stats
+
+    def test_results_in_listing_order(self):
+        pages, _, _ = self.fetch_all(12, concurrency=4, rate=0)
+        self.assertEqual(pages, [f"/page/{i}" for i in range(12)])
+
+    def test_in_flight_bounded_by_concurrency(self):
+        _, elapsed, stats = self.fetch_all(16, concurrency=4, rate=0)
+        self.assertEqual(stats["requests"], 16)
+        self.assertEqual(stats["max_in_flight"], 4)
+        # параллельно, а не по очереди: 8 медленных по DELAY и 8 быстрых
+        serial = 8 * DELAY + 8 * DELAY / 4
+        self.assertLess(elapsed, serial / 2)
+
+    def test_rate_limits_requests_not_latency(self):
+        count, rate, concurrency = 30, 20.0, 4
+        _, elapsed, _ = self.fetch_all(count, concurrency=concurrency, rate=rate)
+        # всплеск в concurrency запросов сразу, остальные — по 1/rate секунды;
+        # задержки ответов перекрываются и почти ничего не добавляют
+        expected = (count - concurrency) / rate
+        latencies = count / 2 * (DELAY + DELAY / 4)  # если бы качали по очереди
+        self.assertGreater(elapsed, expected * 0.95)
+        self.assertLess(elapsed, min(expected + DELAY + 0.25, latencies))
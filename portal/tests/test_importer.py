@@ -0,0 +1,88 @@
+"""
+Импорт по расписанию (run_importer): блокировка JobLock, отсрочка
+после ошибок, журнал ImportRun и остановка по SIGTERM. До сети дело не
+доходит — задачу держит «другой узел».
+"""
+import os
+import signal
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+
+from portal.management.commands.run_importer import Job
+from portal.models import ImportRun, JobLock
+
+TTL = timedelta(minutes=30)
+
+
+class JobLockTests(TestCase):
+    def test_live_lock_refuses_other_owner(self):
+        self.assertTrue(JobLock.acquire("job", "a", TTL))
+        self.assertFalse(JobLock.acquire("job", "b", TTL))
+        self.assertEqual(JobLock.objects.get(name="job").owner, "a")
+
+    def test_owner_renews(self):
+        JobLock.acquire("job", "a", timedelta(seconds=1))
+        self.assertTrue(JobLock.acquire("job", "a", TTL))
+        lock = JobLock.objects.get(name="job")
+        self.assertGreater(lock.expires_at, timezone.now() + TTL - timedelta(minutes=1))
+
+    def test_expired_lock_taken_over(self):
+        JobLock.acquire("job", "a", TTL)
+        JobLock.objects.filter(name="job").update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(JobLock.acquire("job", "b", TTL))
+        self.assertEqual(JobLock.objects.get(name="job").owner, "b")
+
+    def test_release_only_by_owner(self):
+        JobLock.acquire("job", "a", TTL)
+        JobLock.release("job", "b")
+        self.assertTrue(JobLock.objects.filter(name="job").exists())
+        JobLock.release("job", "a")
+        self.assertFalse(JobLock.objects.filter(name="job").exists())
+
+
+class JobScheduleTests(SimpleTestCase):
+    @mock.patch("portal.management.commands.run_importer.time.monotonic", return_value=1000.0)
+    def test_backoff_doubles_up_to_interval(self, _):
+        job = Job("news", every=600, limit=10)
+        delays = []
+        for ok in (False, False, False, False, False, False, True, False):
+            job.schedule(ok, retry=60)
+            delays.append(job.due - 1000.0)
+        self.assertEqual(delays, [60, 120, 240, 480, 600, 600, 600, 60])
+
+
+class RunImporterTests(TransactionTestCase):
+    # run_job() закрывает соединения (close_old_connections) — без обёртки-транзакции
+    def setUp(self):
+        JobLock.acquire("import_rea:news", "other-node", TTL)
+
+    def run_importer(self, *args) -> str:
+        out = StringIO()
+        call_command("run_importer", "--events-every", "0", *args, stdout=out)
+        return out.getvalue()
+
+    def test_locked_run_is_recorded(self):
+        self.run_importer("--once")
+        run = ImportRun.objects.get()
+        self.assertEqual((run.kind, run.status), ("news", ImportRun.Status.LOCKED))
+        self.assertIsNotNone(run.finished)
+        self.assertEqual(JobLock.objects.get(name="import_rea:news").owner, "other-node")
+
+    def test_sigterm_stops_loop(self):
+        # первый запуск пропускается из-за блокировки, дальше цикл спит до следующего
+        before = signal.getsignal(signal.SIGTERM)
+        timer = threading.Timer(0.5, os.kill, (os.getpid(), signal.SIGTERM))
+        timer.start()
+        try:
+            out = self.run_importer("--news-every", "3600")
+        finally:
+            timer.cancel()
+        self.assertIn("Остановлено", out)
+        self.assertEqual(ImportRun.objects.get().status, ImportRun.Status.LOCKED)
+        self.assertIs(signal.getsignal(signal.SIGTERM), before)
@@ -0,0 +1,106 @@
+"""
+Планы запросов: все страницы портала открываются на синтетических данных,
+для каждого SELECT снимается EXPLAIN QUERY PLAN. Тест падает, если
+какой-то запрос читает таблицу целиком (SCAN без индекса) или сортирует
+через временное B-дерево (USE TEMP B-TREE). Сортировка в памяти
+допустима, только если выборка ограничена равенством по индексу (записи
+одного пользователя) или поиском FTS.
+
+Только SQLite: планы и регулярки ниже — его.
+"""
+import random
+import re
+import unittest
+
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from portal.management.bench import bench_user, portal_routes, sample_kwargs, seed_dataset
+from portal.tests import TEST_CACHES
+
+# небольшой, но не игрушечный набор: планировщику есть из чего выбирать
+SIZES = {
+    "users": 500,
+    "groups": 10,
+    "lessons_per_group": 200,
+    "events": 500,
+    "registrations_per_event": 10,
+    "news": 2000,
+}
+
+FULL_SCAN = re.compile(r"\bSCAN (\w+)(?!.*\b(?:USING (?:COVERING )?INDEX|VIRTUAL TABLE)\b)")
+TEMP_SORT = re.compile(r"USE TEMP B-TREE")
+# строки одного ключа (записи пользователя) или найденные FTS: сортировать
+# их в памяти нормально — их немного при любом размере таблиц
+BOUNDED = re.compile(r"^SEARCH \w+ USING .*\((?:\w+=\? AND )*\w+=\?\)$|VIRTUAL TABLE")
+
+# таблицы, которые читать целиком нормально: в них единицы строк
+SMALL_TABLES = {"django_content_type", "django_migrations", "portal_studygroup"}
+
+# шаблонов этих страниц в проекте нет (TemplateDoesNotExist, HTTP 500) —
+# их планы проверить нельзя, пока страницы не починят
+BROKEN_ROUTES = {"profile_edit", "change_password"}
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "планы разбираются для SQLite")
+@override_settings(CACHES=TEST_CACHES)
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_dataset(SIZES, random.Random(1))
+        with connection.cursor() as cur:
+            cur.execute("ANALYZE")
+
+    def pages(self):
+        """(имя, клиент, путь) для всех страниц, включая варианты с параметрами."""
+        user = bench_user()
+        anon, auth = Client(), Client()
+        auth.force_login(user)
+        for name, path in portal_routes(sample_kwargs(user)):
+            if name in BROKEN_ROUTES:
+                continue
+            yield name, anon, path
+            yield name, auth, path
+        yield "news?q", anon, reverse("portal:news") + "?q=студент"
+        yield "schedule?month", auth, reverse("portal:schedule") + "?view=month"
+        # вторая страница лент — через курсор с первой
+        for name in ("news", "events"):
+            page = auth.get(reverse(f"portal:{name}")).context["page_obj"]
+            if page.has_next():
+                yield f"{name}?after", auth, reverse(f"portal:{name}") + f"?after={page.next_token}"
+
+    def test_no_full_scans_or_temp_sorts(self):
+        problems, seen = [], set()
+        for name, client, path in self.pages():
+            queries = []
+
+            def capture(execute, sql, params, many, context):
+                if sql.lstrip().upper().startswith("SELECT"):
+                    queries.append((sql, params))
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(capture):
+                response = client.get(path)
+                # ленты .ics отдаются потоком: их запросы идут при чтении тела
+                if response.streaming:
+                    b"".join(response.streaming_content)
+            self.assertIn(response.status_code, (200, 302), f"[{name}] {path}")
+
+            for sql, params in queries:
+                if sql in seen:
+                    continue
+                seen.add(sql)
+                with connection.cursor() as cur:
+                    cur.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                    plan = [row[-1] for row in cur.fetchall()]
+                bounded = bool(plan) and BOUNDED.search(plan[0])
+                bad = [
+                    step for step in plan
+                    if TEMP_SORT.search(step) and not bounded
+                    or (m := FULL_SCAN.search(step)) and m[1] not in SMALL_TABLES
+                ]
+                if bad:
+                    problems.append(f"[{name}] {sql}\n" + "\n".join(f"    {step}" for step in plan))
+        if problems:
+            self.fail(f"проблемных запросов: {len(problems)}\n\n" + "\n\n".join(problems))
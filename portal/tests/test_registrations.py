@@ -0,0 +1,85 @@
+"""
+Параллельная запись на мероприятие: одновременные регистрации и отмены
+не должны «переполнить» событие или сбить счётчики.
+"""
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from portal.models import Event, EventRegistration
+from portal.tests import TEST_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ConcurrentRegistrationTests(TransactionTestCase):
+    USERS = 150
+    CAPACITY = 50
+    THREADS = 20
+
+    def setUp(self):
+        self.event = Event.objects.create(
+            title="Stress", start_time=timezone.now(), capacity=self.CAPACITY
+        )
+        User.objects.bulk_create(User(username=f"stress{i}") for i in range(self.USERS))
+        self.users = list(User.objects.filter(username__startswith="stress"))
+        self.roles = [r for r, _ in EventRegistration.Role.choices]
+        self.rnd = random.Random(1)
+
+    def run_parallel(self, fn, items) -> list:
+        """fn(item) для всех items из THREADS потоков, стартующих разом."""
+        start = threading.Barrier(self.THREADS)
+
+        def work(item):
+            try:
+                try:
+                    start.wait(timeout=0.5)
+                except threading.BrokenBarrierError:
+                    pass
+                return fn(item)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(self.THREADS) as pool:
+            return list(pool.map(work, items))
+
+    def fresh_event(self) -> Event:
+        return Event.objects.get(pk=self.event.pk)
+
+    def assert_consistent(self, expected=None):
+        event = self.fresh_event()
+        actual = {
+            field: EventRegistration.objects.filter(event=event, role=role).count()
+            for role, field in EventRegistration.COUNTERS.items()
+        }
+        self.assertEqual({field: getattr(event, field) for field in actual}, actual)
+        total = sum(actual.values())
+        self.assertLessEqual(total, event.capacity)
+        if expected is not None:
+            self.assertEqual(total, expected)
+
+    def test_no_overbooking(self):
+        accepted = sum(self.run_parallel(
+            lambda u: self.fresh_event().register(u, self.rnd.choice(self.roles)), self.users
+        ))
+        self.assertEqual(accepted, self.CAPACITY)
+        self.assert_consistent(expected=self.CAPACITY)
+
+    def test_mixed_register_and_unregister(self):
+        self.run_parallel(
+            lambda u: self.fresh_event().register(u, self.rnd.choice(self.roles)), self.users
+        )
+        # половина отменяет, остальные пытаются записаться или сменить роль
+        mixed = [(u, self.rnd.random() < 0.5) for u in self.users]
+        self.run_parallel(
+            lambda x: self.fresh_event().unregister(x[0]) if x[1]
+            else self.fresh_event().register(x[0], self.rnd.choice(self.roles)),
+            mixed,
+        )
+        self.assert_consistent()
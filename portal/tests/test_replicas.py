@@ -0,0 +1,151 @@
+"""
+Маршрутизация на реплики (portal/routers.py) на двух локальных базах:
+тестовая основная и её копия-«реплика», снятая в setUp и дальше не
+догоняющая — как реплика с отставанием. Окно закрепления сокращено до
+секунды.
+"""
+import random
+import sqlite3
+import tempfile
+import time
+import unittest
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import F, Q
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from portal import cache, routers
+from portal.management.bench import bench_user, seed_dataset
+from portal.models import Event, EventRegistration
+from portal.tests import TEST_CACHES
+
+SIZES = {
+    "users": 50,
+    "groups": 3,
+    "lessons_per_group": 10,
+    "events": 20,
+    "registrations_per_event": 3,
+    "news": 30,
+}
+REPLICA = f"{routers.REPLICA_PREFIX}1"
+
+
+@contextmanager
+def lagging_replica(alias: str):
+    """Копия текущей БД под алиасом alias; изменения основной в неё не попадают."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "replica.sqlite3")
+        src, dst = sqlite3.connect(connection.settings_dict["NAME"]), sqlite3.connect(path)
+        try:
+            src.backup(dst)
+        finally:
+            src.close()
+            dst.close()
+        connections.settings[alias] = {**connection.settings_dict, "NAME": path, "TEST": {}}
+        try:
+            yield
+        finally:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "реплика — копия файла SQLite")
+@override_settings(CACHES=TEST_CACHES)
+class ReplicaRoutingTests(TransactionTestCase):
+    def setUp(self):
+        seed_dataset(SIZES, random.Random(1))
+        self.user = user = bench_user()
+        has_room = Q(capacity__isnull=True) | Q(
+            capacity__gt=F("guests_count") + F("participants_count") + F("organizers_count")
+        )
+        self.event = Event.objects.filter(has_room).exclude(registrations__user=user).first()
+        self.detail = reverse("portal:event_detail", kwargs={"pk": self.event.pk})
+        self.client = Client()
+        self.client.force_login(user)
+        self.enterContext(lagging_replica(REPLICA))
+        # алиас появился после проверок класса: разрешаем его только на время
+        # теста — сбрасывать (flush) копию в _post_teardown незачем
+        self.enterContext(mock.patch.object(type(self), "databases", self.databases | {REPLICA}))
+        self.enterContext(mock.patch.object(routers, "STICKY_SECONDS", 1))
+        # seed_dataset() только что инвалидировал контент
+        self.wait_window()
+
+    def tearDown(self):
+        cache.cache.clear()
+
+    def wait_window(self):
+        time.sleep(routers.STICKY_SECONDS)
+
+    def request(self, call, *args):
+        """(результат call(*args), число SQL-запросов по алиасам)."""
+        hits = {DEFAULT_DB_ALIAS: 0, REPLICA: 0}
+
+        def counter(alias):
+            def wrapper(execute, sql, params, many, context):
+                hits[alias] += 1
+                return execute(sql, params, many, context)
+            return wrapper
+
+        with ExitStack() as stack:
+            for alias in hits:
+                stack.enter_context(connections[alias].execute_wrapper(counter(alias)))
+            result = call(*args)
+        return result, hits
+
+    def assertOnlyOn(self, alias: str, hits: dict):
+        self.assertGreater(hits[alias], 0, hits)
+        self.assertEqual(sum(n for a, n in hits.items() if a != alias), 0, hits)
+
+    def test_page_reads_go_to_replica(self):
+        _, hits = self.request(self.client.get, self.detail)
+        self.assertOnlyOn(REPLICA, hits)
+
+    def test_writer_reads_own_writes_then_returns_to_replica(self):
+        response, hits = self.request(
+            self.client.post, self.detail, {"role": "guest", "register": "1"}
+        )
+        self.assertOnlyOn(DEFAULT_DB_ALIAS, hits)
+        self.assertEqual(int(response.cookies[routers.PIN_COOKIE]["max-age"]), 1)
+
+        response, hits = self.request(self.client.get, self.detail)
+        self.assertOnlyOn(DEFAULT_DB_ALIAS, hits)
+        self.assertIsNotNone(response.context["registration"])
+
+        self.wait_window()
+        self.client.cookies.pop(routers.PIN_COOKIE)  # браузер удалит её сам по max-age
+        response, hits = self.request(self.client.get, self.detail)
+        self.assertOnlyOn(REPLICA, hits)
+        # реплика отстаёт: записи на ней нет — значит, читали действительно с неё
+        self.assertIsNone(response.context["registration"])
+
+    def test_others_keep_reading_replica_after_registration(self):
+        other = Client()
+        other.force_login(get_user_model().objects.exclude(pk=self.user.pk).first())
+        self.client.post(self.detail, {"role": "guest", "register": "1"})
+        _, hits = self.request(other.get, self.detail)
+        self.assertOnlyOn(REPLICA, hits)
+
+    def test_fresh_content_from_replica_is_not_cached(self):
+        home, news = reverse("portal:home"), reverse("portal:news")
+        cache.bump(cache.NEWS)
+        for _ in range(2):
+            _, hits = self.request(Client().get, home)
+            self.assertOnlyOn(REPLICA, hits)
+        response = Client().get(news)
+        self.assertFalse(response.has_header("ETag"))
+
+        self.wait_window()
+        self.request(Client().get, home)
+        _, hits = self.request(Client().get, home)
+        self.assertEqual(sum(hits.values()), 0, hits)
+        self.assertTrue(Client().get(news).has_header("ETag"))
+
+    def test_reads_outside_requests_use_primary(self):
+        _, hits = self.request(lambda: EventRegistration.objects.filter(event=self.event).count())
+        self.assertOnlyOn(DEFAULT_DB_ALIAS, hits)
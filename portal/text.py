@@ -0,0 +1,51 @@
+# portal/text.py
+"""
+Производные от HTML-текста: чистый текст, анонс и первая картинка.
+Считаются один раз при сохранении, а не в шаблоне на каждый рендер.
+"""
+from __future__ import annotations
+
+import html
+import re
+
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 40
+
+_IMG_SRC_RE = re.compile(r"""<img\b[^>]*?\bsrc\s*=\s*(["']?)([^"'\s>]+)\1""", re.I)
+
+
+def plain_text(value: str) -> str:
+    """HTML → обычный текст: без тегов, сущностей и лишних пробелов."""
+    return " ".join(html.unescape(strip_tags(value or "")).split())
+
+
+def make_excerpt(value: str, words: int = EXCERPT_WORDS) -> str:
+    """Анонс для карточки — как ``|striptags|truncatewords:40`` в шаблоне."""
+    return Truncator(plain_text(value)).words(words)
+
+
+def first_image(value: str) -> str:
+    """URL первой картинки <img src=…> или пустая строка."""
+    m = _IMG_SRC_RE.search(value or "")
+    return html.unescape(m[2]) if m else ""
+
+
+def backfill_derived(queryset, source: str, batch_size: int = 500) -> int:
+    """
+    Пересчитать excerpt/image для всех строк queryset-а пачками.
+    source — имя HTML-поля (body / description). Возвращает число строк.
+    """
+    total, batch = 0, []
+    for obj in queryset.only("pk", source).iterator(batch_size):
+        value = getattr(obj, source)
+        obj.excerpt, obj.image = make_excerpt(value), first_image(value)
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            queryset.bulk_update(batch, ["excerpt", "image"])
+            total += len(batch)
+            batch = []
+    if batch:
+        queryset.bulk_update(batch, ["excerpt", "image"])
+    return total + len(batch)
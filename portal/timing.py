@@ -0,0 +1,206 @@
+# portal/timing.py
+"""
+Замеры на каждый запрос: число SQL-запросов, время в БД, время рендера
+шаблонов и общее время.
+
+* RequestTimingMiddleware — собирает замеры, отдаёт их заголовком
+  ``Server-Timing`` и складывает в агрегат по имени URL;
+* TimedDjangoTemplates — бэкенд шаблонов, засекающий рендер;
+* медленные запросы (дольше PORTAL_SLOW_QUERY_MS) пишутся в лог
+  ``portal.sql.slow``.
+
+Агрегат живёт в памяти процесса (у каждого воркера свой), смотреть —
+``/_timing/`` под staff-пользователем.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger("portal.sql.slow")
+
+SLOW_QUERY_MS = getattr(settings, "PORTAL_SLOW_QUERY_MS", 100)
+SERVER_TIMING = getattr(settings, "PORTAL_SERVER_TIMING", True)
+
+
+class RequestStats:
+    __slots__ = ("sql_count", "sql_time", "tpl_time", "tpl_depth", "view_name")
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.tpl_time = 0.0
+        self.tpl_depth = 0
+        self.view_name = ""
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("portal_request_stats", default=None)
+
+
+# ─────────────────────────  агрегат по URL  ────────────────
+_lock = threading.Lock()
+_aggregate: dict[str, dict] = {}
+
+
+def record(name: str, stats: RequestStats, total: float) -> None:
+    with _lock:
+        row = _aggregate.get(name)
+        if row is None:
+            row = _aggregate[name] = {
+                "requests": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "sql_count": 0, "sql_ms": 0.0, "template_ms": 0.0,
+            }
+        row["requests"] += 1
+        row["total_ms"] += total * 1000
+        row["max_ms"] = max(row["max_ms"], total * 1000)
+        row["sql_count"] += stats.sql_count
+        row["sql_ms"] += stats.sql_time * 1000
+        row["template_ms"] += stats.tpl_time * 1000
+
+
+def snapshot() -> dict:
+    """Копия агрегата со средними значениями на запрос."""
+    with _lock:
+        rows = {name: dict(row) for name, row in _aggregate.items()}
+    for row in rows.values():
+        n = row["requests"]
+        for key in ("total_ms", "max_ms", "sql_ms", "template_ms"):
+            row[key] = round(row[key], 3)
+        row.update({
+            "avg_ms": round(row["total_ms"] / n, 3),
+            "avg_sql_count": round(row["sql_count"] / n, 2),
+            "avg_sql_ms": round(row["sql_ms"] / n, 3),
+            "avg_template_ms": round(row["template_ms"] / n, 3),
+        })
+    return rows
+
+
+def reset() -> None:
+    with _lock:
+        _aggregate.clear()
+
+
+# ─────────────────────────  SQL  ───────────────────────────
+def _sql_wrapper(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:  # вне запроса (команды, миграции) не меряем
+        return execute(sql, params, many, context)
+    t0 = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        dt = time.perf_counter() - t0
+        stats.sql_count += 1
+        stats.sql_time += dt
+        if dt * 1000 >= SLOW_QUERY_MS:
+            logger.warning("%.1f ms [%s] %s", dt * 1000, stats.view_name, sql[:1000])
+
+
+def _install_wrapper(connection) -> None:
+    # в начало списка: execute_wrapper() снимает обёртки через pop(),
+    # и наша, добавленная посреди чужого with, не должна сняться вместо той
+    if _sql_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _sql_wrapper)
+
+
+@receiver(connection_created)
+def _wrap_new_connection(sender, connection, **kwargs):
+    """
+    Обёртка ставится на каждое соединение навсегда, а не на время
+    запроса: у ASGI async ORM ходит в БД из потоков со своими
+    соединениями. Запрос она находит через contextvar _current — его
+    копия есть и в этих потоках.
+    """
+    _install_wrapper(connection)
+
+
+for _conn in connections.all(initialized_only=True):
+    _install_wrapper(_conn)
+
+
+# ─────────────────────────  шаблоны  ───────────────────────
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None:
+            return super().render(context, request)
+        stats.tpl_depth += 1
+        t0 = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.tpl_depth -= 1
+            if not stats.tpl_depth:  # вложенные рендеры уже учтены внешним
+                stats.tpl_time += time.perf_counter() - t0
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates, засекающий время рендера для RequestTimingMiddleware."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+# ─────────────────────────  middleware  ────────────────────
+class RequestTimingMiddleware:
+    # и WSGI, и ASGI: синхронная middleware в async-стеке заставила бы
+    # Django гонять каждый запрос через поток
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        t0 = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - t0)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        t0 = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, stats, time.perf_counter() - t0)
+
+    def finish(self, request, response, stats: RequestStats, total: float):
+        match = getattr(request, "resolver_match", None)
+        record(match.view_name if match else "<unresolved>", stats, total)
+        if SERVER_TIMING:
+            response["Server-Timing"] = (
+                f'db;dur={stats.sql_time * 1000:.1f};desc="{stats.sql_count} queries", '
+                f"tpl;dur={stats.tpl_time * 1000:.1f}, "
+                f"total;dur={total * 1000:.1f}"
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # имя URL для лога медленных запросов
+        stats = _current.get()
+        if stats is not None and request.resolver_match:
+            stats.view_name = request.resolver_match.view_name
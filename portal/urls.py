@@ -1,13 +1,16 @@
+from django.conf import settings
 from django.urls import path
 from django.views.generic import TemplateView
 from django.contrib.auth import views as auth_views
-from . import views
-from .views import EventListView, EventDetailView
+from . import async_views, views
+
+# читающие страницы: под ASGI — async-версии (см. async_views.py)
+read = async_views if settings.PORTAL_ASYNC_VIEWS else views
 
 app_name = "portal"
 
 urlpatterns = [
-    path("", views.index, name="home"),
+    path("", read.index, name="home"),
 
     # ─── пять пустых страниц
     path("history/", views.page1, name="page1"),
@@ -17,16 +20,20 @@ urlpatterns = [
     path("plechanovka/", views.page5, name="page5"),
 
     # ─── новости
-    path("news/", views.NewsListView.as_view(),      name="news"),
-    path("news_list/", views.NewsListView.as_view(),      name="news_list"),
-    path("news/<int:pk>/", views.NewsDetailView.as_view(), name="news_detail"),
+    path("news/", read.NewsListView.as_view(),      name="news"),
+    path("news_list/", read.NewsListView.as_view(),      name="news_list"),
+    path("news/<int:pk>/", read.NewsDetailView.as_view(), name="news_detail"),
 
     # ─── мероприятия
-    path("events/", EventListView.as_view(), name="events"),
-    path("event/<int:pk>/", EventDetailView.as_view(), name="event_detail"),
+    path("events/", read.EventListView.as_view(), name="events"),
+    path("event/<int:pk>/", read.EventDetailView.as_view(), name="event_detail"),
 
     # ─── расписание
-    path("schedule/", views.ScheduleView.as_view(), name="schedule"),
+    path("schedule/", read.ScheduleView.as_view(), name="schedule"),
+
+    # ─── iCalendar-ленты
+    path("calendar/events.ics", views.events_ics, name="events_ics"),
+    path("calendar/<str:token>/schedule.ics", views.personal_ics, name="personal_ics"),
 
     # ─── личный кабинет
     path("profile/",           views.profile,        name="profile"),
@@ -44,4 +51,7 @@ urlpatterns = [
     path("faq/",      TemplateView.as_view(template_name="faq.html"),      name="faq"),
 
     path("unions/", views.unions_list, name="unions"),
+
+    # ─── диагностика (staff)
+    path("_timing/", views.timing_stats, name="timing_stats"),
 ]
@@ -1,24 +1,32 @@
 # portal/views.py
+import os
 from urllib.parse import quote
-from datetime import timezone as dt_tz
+from datetime import date, datetime, time, timedelta, timezone as dt_tz
 
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import update_session_auth_hash
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import PasswordChangeForm, UserCreationForm
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
+from django.contrib.auth import get_user_model
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.utils import timezone
+from django.utils.functional import cached_property
+from django.views.decorators.http import condition
 from django.views.generic import (
     CreateView, ListView, DetailView, TemplateView
 )
 
+from . import cache, ics, search, timing
+from .conditional import ConditionalGetMixin
 from .forms import ProfileForm, EventRegistrationForm
+from .pagination import KeysetPaginationMixin
 from .models import (
     Event, EventRegistration, News,
-    Lesson, StudyGroup
+    Lesson,
 )
 
 # ─────────────────────────  util  ──────────────────────────
@@ -44,17 +52,7 @@ class SignUpView(CreateView):
 
 # ─────────────────────────  index  ─────────────────────────
 def index(request):
-    upcoming = Event.objects.filter(
-        start_time__gte=timezone.now()
-    ).order_by("start_time")[:5]
-
-    latest_news = News.objects.order_by("-published")[:5]
-
-    return render(
-        request,
-        "portal/index.html",
-        {"upcoming": upcoming, "news_list": latest_news},
-    )
+    return render(request, "portal/index.html", cache.index_payload())
 
 # ─────────────────────────  static stubs  ──────────────────
 def page1(r): return render(r, "page1.html")
@@ -64,55 +62,128 @@ def page4(r): return render(r, "page4.html")
 def page5(r): return render(r, "page5.html")
 
 # ─────────────────────────  news  ──────────────────────────
-class NewsListView(ListView):
+def _generation_time(gen: int) -> datetime:
+    # поколение кэша — это time_ns() последнего изменения
+    return datetime.fromtimestamp(gen / 1e9, tz=dt_tz.utc)
+
+
+def _upcoming_pks():
+    return (
+        Event.objects.filter(start_time__gte=timezone.now())
+        .order_by("start_time", "pk").values_list("pk", flat=True)
+    )
+
+
+def _upcoming_marker() -> str:
+    """
+    Версия списка предстоящих мероприятий: поколение кэша + ближайшее
+    событие (список сдвигается, когда оно начинается).
+    """
+    return f"{cache.generation(cache.EVENTS)}:{_upcoming_pks().first()}"
+
+
+class NewsListView(ConditionalGetMixin, KeysetPaginationMixin, ListView):
     model = News
     template_name = "portal/news_list.html"
     paginate_by = 10
     context_object_name = "news_list"
+    keyset_ordering = ("-published", "-pk")
 
     def get_queryset(self):
-        qs = super().get_queryset().order_by("-published")
-        q = self.request.GET.get("q")
-        if q:
-            qs = qs.filter(Q(title__icontains=q) | Q(body__icontains=q))
+        # карточкам хватает анонса — полный body не тянем
+        qs = super().get_queryset().defer("body").order_by("-published")
+        self.q = self.request.GET.get("q", "").strip()
+        if self.q:
+            qs = search.search_news(qs, self.q)
         return qs
 
+    @cached_property
+    def cache_gen(self) -> int:
+        return cache.generation(cache.NEWS)
+
+    def content_etag(self, request, *args, **kwargs):
+        return f"news-list:{self.cache_gen}:{request.GET.urlencode()}"
+
+    def content_last_modified(self, request, *args, **kwargs):
+        return _generation_time(self.cache_gen)
+
+    def use_keyset(self):
+        # результаты поиска отсортированы по релевантности — там обычные страницы
+        return not self.q
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx.update({
+            "q": self.q,
+            "cache_gen": self.cache_gen,
+            # 0 — фрагменты рендерятся, но в кэш не кладутся
+            "cache_ttl": cache.TTL if cache.cacheable(self.cache_gen) else 0,
+        })
+        return ctx
+
 
-class NewsDetailView(DetailView):
+class NewsDetailView(ConditionalGetMixin, DetailView):
     model = News
     template_name = "portal/news_detail.html"
     context_object_name = "news"
 
 # ─────────────────────────  events  ────────────────────────
-class EventListView(ListView):
+class EventListView(ConditionalGetMixin, KeysetPaginationMixin, ListView):
     model = Event
     template_name = "portal/events.html"
     context_object_name = "event_list"
     paginate_by = 10
+    keyset_ordering = ("start_time", "pk")
 
     def get_queryset(self):
         return (
             Event.objects
             .filter(start_time__gte=timezone.now())
+            .defer("description")
             .order_by("start_time")
         )
 
+    @cached_property
+    def cache_gen(self) -> int:
+        return cache.generation(cache.EVENTS)
 
-class EventDetailView(DetailView):
+    @cached_property
+    def upcoming_first(self):
+        return _upcoming_pks().first()
+
+    def content_etag(self, request, *args, **kwargs):
+        return f"events:{self.cache_gen}:{self.upcoming_first}:{request.GET.urlencode()}"
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx.update({
+            "cache_gen": self.cache_gen,
+            "cache_ttl": cache.TTL if cache.cacheable(self.cache_gen) else 0,
+        })
+        return ctx
+
+
+class EventDetailView(ConditionalGetMixin, DetailView):
     """CBV-замена старой FBV `event_detail` с поддержкой регистрации."""
     model = Event
     template_name = "portal/event_detail.html"
     context_object_name = "event"
 
+    # ETag/Last-Modified — по Event.updated: регистрации его тоже двигают
+
+    def registration_queryset(self):
+        return EventRegistration.objects.filter(event=self.object, user=self.request.user)
+
+    @cached_property
+    def registration(self):
+        if not self.request.user.is_authenticated:
+            return None
+        return self.registration_queryset().first()
+
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         event: Event = self.object
-        user = self.request.user
-        reg = (
-            EventRegistration.objects
-            .filter(event=event, user=user)
-            .first() if user.is_authenticated else None
-        )
+        reg = self.registration
         ctx.update({
             "gcal": _gcal_link(event),
             "registration": reg,
@@ -132,32 +203,153 @@ class EventDetailView(DetailView):
         if form.is_valid():
             role = form.cleaned_data["role"]
             if "register" in request.POST:
-                EventRegistration.objects.update_or_create(
-                    event=self.object, user=request.user,
-                    defaults={"role": role}
-                )
-                messages.success(request, "Вы зарегистрированы!")
+                if self.object.register(request.user, role):
+                    messages.success(request, "Вы зарегистрированы!")
+                else:
+                    messages.error(request, "Свободных мест нет")
             elif "unregister" in request.POST:
-                EventRegistration.objects.filter(
-                    event=self.object, user=request.user
-                ).delete()
+                self.object.unregister(request.user)
                 messages.info(request, "Регистрация отменена")
         return redirect("portal:event_detail", pk=self.object.pk)
 
 # ─────────────────────────  schedule  ──────────────────────
+def _schedule_window(mode: str, anchor: date):
+    """
+    Границы окна расписания [start, end) и опорные даты соседних окон.
+    Неделя — с понедельника, месяц — календарный.
+    """
+    if mode == "month":
+        start = anchor.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+        prev = (start - timedelta(days=1)).replace(day=1)
+        return start, end, prev, end
+    start = anchor - timedelta(days=anchor.weekday())
+    end = start + timedelta(days=7)
+    return start, end, start - timedelta(days=7), end
+
+
 class ScheduleView(LoginRequiredMixin, TemplateView):
     template_name = "portal/schedule.html"
+    MODES = ("week", "month")
+    ANCHOR_MIN = date.min + timedelta(days=31)
+    ANCHOR_MAX = date.max - timedelta(days=62)
 
-    def get_context_data(self, **kwargs):
-        ctx = super().get_context_data(**kwargs)
-        groups = StudyGroup.objects.filter(students=self.request.user)
-        ctx["lessons"] = (
-            Lesson.objects.filter(group__in=groups)
+    @cached_property
+    def window(self):
+        """(режим, начало, конец, соседнее окно назад, вперёд)."""
+        mode = self.request.GET.get("view")
+        if mode not in self.MODES:
+            mode = "week"
+        try:
+            anchor = date.fromisoformat(self.request.GET.get("date", ""))
+        except ValueError:
+            anchor = timezone.localdate()
+        # у краёв календаря соседние окна уже не вычислить (OverflowError)
+        anchor = min(max(anchor, self.ANCHOR_MIN), self.ANCHOR_MAX)
+        return (mode, *_schedule_window(mode, anchor))
+
+    def lessons_queryset(self):
+        _, start, end, _, _ = self.window
+        tz = timezone.get_current_timezone()
+        return (
+            Lesson.objects.filter(
+                group__students=self.request.user,
+                datetime__gte=datetime.combine(start, time.min, tzinfo=tz),
+                datetime__lt=datetime.combine(end, time.min, tzinfo=tz),
+            )
             .select_related("group")
             .order_by("datetime")
         )
+
+    @cached_property
+    def lessons(self) -> list:
+        return list(self.lessons_queryset())
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        mode, start, end, prev, nxt = self.window
+
+        # группировка по дням за один проход (lessons уже отсортированы)
+        days = []
+        for lesson in self.lessons:
+            day = timezone.localtime(lesson.datetime).date()
+            if not days or days[-1][0] != day:
+                days.append((day, []))
+            days[-1][1].append(lesson)
+
+        ctx.update({
+            "mode": mode,
+            "days": days,
+            "window_start": start,
+            "window_end": end - timedelta(days=1),
+            "prev_date": prev,
+            "next_date": nxt,
+            "today": timezone.localdate(),
+        })
         return ctx
 
+# ─────────────────────────  calendar feeds  ────────────────
+def _ics_response(name, vevents, filename):
+    response = StreamingHttpResponse(
+        ics.calendar(name, vevents), content_type="text/calendar; charset=utf-8"
+    )
+    response["Content-Disposition"] = f'inline; filename="{filename}"'
+    return response
+
+
+@condition(etag_func=lambda request: f"events-ics:{_upcoming_marker()}")
+def events_ics(request):
+    """Публичная лента ближайших мероприятий."""
+    events = (
+        Event.objects.filter(start_time__gte=timezone.now())
+        .only("pk", "title", "start_time", "end_time", "excerpt")
+        .order_by("start_time")
+    )
+    url = lambda ev: request.build_absolute_uri(reverse("portal:event_detail", args=[ev.pk]))
+    return _ics_response(
+        "Мероприятия РЭУ",
+        ics.event_vevents(events.iterator(chunk_size=500), url),
+        "events.ics",
+    )
+
+
+def _personal_ics_etag(request, token):
+    uid = ics.user_id_from_token(token)
+    if uid is None:
+        return None
+    # окно ленты сдвигается раз в сутки
+    return ":".join(str(p) for p in (
+        "personal-ics", uid, cache.generation(cache.LESSONS),
+        cache.generation(cache.EVENTS), timezone.localdate(),
+    ))
+
+
+@condition(etag_func=_personal_ics_etag)
+def personal_ics(request, token):
+    """Личная лента: занятия групп пользователя и его мероприятия."""
+    uid = ics.user_id_from_token(token)
+    if uid is None or not get_user_model().objects.filter(pk=uid, is_active=True).exists():
+        raise Http404
+    since = timezone.now() - ics.HISTORY
+    lessons = (
+        Lesson.objects.filter(group__students=uid, datetime__gte=since)
+        .select_related("group")
+        .only("pk", "title", "datetime", "group__name")
+        .order_by("datetime")
+    )
+    events = (
+        Event.objects.filter(registrations__user_id=uid, start_time__gte=since)
+        .only("pk", "title", "start_time", "end_time", "excerpt")
+        .order_by("start_time")
+    )
+    url = lambda ev: request.build_absolute_uri(reverse("portal:event_detail", args=[ev.pk]))
+
+    def vevents():
+        yield from ics.lesson_vevents(lessons.iterator(chunk_size=500))
+        yield from ics.event_vevents(events.iterator(chunk_size=500), url)
+
+    return _ics_response("Моё расписание РЭУ", vevents(), "schedule.ics")
+
 # ─────────────────────────  profile  ───────────────────────
 @login_required
 def profile(request):
@@ -166,7 +358,13 @@ def profile(request):
         .select_related("event")
         .order_by("event__start_time")
     )
-    return render(request, "profile.html", {"registrations": registrations})
+    calendar_url = request.build_absolute_uri(
+        reverse("portal:personal_ics", args=[ics.user_token(request.user)])
+    )
+    return render(
+        request, "profile.html",
+        {"registrations": registrations, "calendar_url": calendar_url},
+    )
 
 
 @login_required
@@ -218,3 +416,11 @@ def unions_list(request):
         "Секретарская академия",
     ]
     return render(request, "portal/unions.html", {"unions": unions})
+
+# ─────────────────────────  diagnostics  ───────────────────
+@staff_member_required
+def timing_stats(request):
+    """Агрегат замеров по URL для текущего воркера (см. portal.timing)."""
+    if request.method == "POST" and "reset" in request.POST:
+        timing.reset()
+    return JsonResponse({"pid": os.getpid(), "views": timing.snapshot()})
@@ -0,0 +1,60 @@
+# portal/warmup.py
+"""
+Прогрев процесса перед fork-ом воркеров gunicorn (preload_app, см.
+gunicorn.conf.py): всё, что иначе каждый воркер делал бы на первых
+запросах, делается один раз в мастере.
+
+* компилируются все шаблоны проекта (templates/) — они попадают в кэш
+  cached-загрузчика, который воркеры наследуют готовым;
+* строятся URL-резолвер и манифест статики;
+* долгоживущие объекты замораживаются gc.freeze(): сборщик мусора в
+  воркерах их не обходит и не пишет в их заголовки, так что страницы
+  памяти остаются общими с мастером (copy-on-write).
+"""
+from __future__ import annotations
+
+import gc
+import logging
+import time
+from pathlib import Path
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.db import connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.urls import get_resolver, reverse
+
+logger = logging.getLogger("portal.warmup")
+
+
+def compile_templates() -> int:
+    """Загрузить все *.html из DIRS шаблонных движков; вернуть их число."""
+    count = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for directory in backend.engine.dirs:
+            for path in sorted(Path(directory).rglob("*.html")):
+                name = path.relative_to(directory).as_posix()
+                try:
+                    backend.engine.get_template(name)
+                except (TemplateDoesNotExist, TemplateSyntaxError) as exc:
+                    logger.warning("шаблон %s не скомпилирован: %s", name, exc)
+                    continue
+                count += 1
+    return count
+
+
+def warm_up(freeze: bool = True) -> dict:
+    """Прогреть процесс; вернуть {"templates": n, "seconds": t}."""
+    started = time.perf_counter()
+    templates = compile_templates()
+    get_resolver().url_patterns
+    reverse("portal:home")  # заполняет обратный словарь резолвера
+    getattr(staticfiles_storage, "hashed_files", None)  # читает манифест
+    # соединение, открытое в мастере, досталось бы всем воркерам сразу
+    connections.close_all()
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    return {"templates": templates, "seconds": time.perf_counter() - started}
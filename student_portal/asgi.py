@@ -1,6 +1,11 @@
 """
 ASGI-точка входа для асинхронных серверов (Uvicorn, Daphne, Hypercorn),
 а также для WebSocket-функций, фоновых задач и пр.
+
+Под ASGI читающие страницы обслуживают async-версии из
+portal/async_views.py (PORTAL_ASYNC_VIEWS). Запуск — gunicorn с
+воркерами uvicorn, настройки те же (gunicorn.conf.py):
+    gunicorn student_portal.asgi:application -k uvicorn_worker.UvicornWorker
 """
 
 import os
@@ -8,6 +13,7 @@ from django.core.asgi import get_asgi_application
 
 # Файл настроек тот же, что и для WSGI
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'student_portal.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 # ASGI-приложение; можно оборачивать в middleware для WebSocket
 application = get_asgi_application()
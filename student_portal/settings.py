@@ -1,15 +1,16 @@
 from pathlib import Path
 import os
+import tempfile
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = "replace-me-with-your-own-secret-key"
 # 123123
 DEBUG = os.getenv("DEBUG", "False") == "True"
-ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "").split(",")
+# домены через запятую; пустой список — при DEBUG Django сам пускает localhost
+ALLOWED_HOSTS = [h for h in os.getenv("ALLOWED_HOSTS", "").split(",") if h]
 STATIC_ROOT  = BASE_DIR / "staticfiles"
 MEDIA_ROOT   = BASE_DIR / "media"
 
-ALLOWED_HOSTS = []  # Добавьте домены либо ['*'] для тестов во внутренней сети
 LOGIN_REDIRECT_URL = 'portal:home'
 LOGOUT_REDIRECT_URL = 'portal:home'
 
@@ -25,6 +26,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "portal.assets.StaticFilesMiddleware",    # /static/ — мимо всего остального
+    "portal.timing.RequestTimingMiddleware",  # первым из остальных: меряет их все
+    "portal.routers.PrimaryPinMiddleware",    # до сессий: их чтение тоже идёт на реплику
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -38,7 +42,7 @@ ROOT_URLCONF = "student_portal.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "portal.timing.TimedDjangoTemplates",  # DjangoTemplates + замер рендера
         "DIRS": [BASE_DIR / "templates"],  # ← глобальная папка шаблонов
         "APP_DIRS": True,
         "OPTIONS": {
@@ -54,13 +58,106 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "student_portal.wsgi.application"
 
-# SQLite — для простоты
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# БД: Postgres, если задан POSTGRES_DB (тот же .env, что у сервиса db
+# в docker-compose), иначе SQLite. PRAGMA для SQLite — в portal/signals.py.
+if os.getenv("POSTGRES_DB"):
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ["POSTGRES_DB"],
+            "USER": os.getenv("POSTGRES_USER", "postgres"),
+            "PASSWORD": os.getenv("POSTGRES_PASSWORD", ""),
+            "HOST": os.getenv("POSTGRES_HOST", "db"),
+            "PORT": os.getenv("POSTGRES_PORT", "5432"),
+            # соединение живёт между запросами, перед переиспользованием проверяется
+            "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
     }
-}
+    # пул psycopg внутри воркера вместо постоянных соединений
+    if os.getenv("DB_POOL", "False") == "True":
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX", "10")),
+            "timeout": 10,
+        }
+    # под ASGI (ASYNC_VIEWS, ставит asgi.py) async ORM ходит в БД из потоков
+    # sync_to_async, а постоянное соединение закрывается только в конце
+    # запроса своего потока — соединения копятся и упираются в
+    # max_connections. Без пула — соединение на запрос
+    elif os.getenv("ASYNC_VIEWS", "False") == "True":
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+else:
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+            # BEGIN IMMEDIATE: записи на мероприятия не ловят deadlock при апгрейде блокировки
+            "OPTIONS": {"transaction_mode": "IMMEDIATE", "timeout": 20},
+            # тестовая БД — в файле: в portal/tests к ней ходят из нескольких
+            # потоков, а общая in-memory база SQLite параллельной записи не держит
+            "TEST": {"NAME": os.path.join(tempfile.gettempdir(), "portal_test.sqlite3")},
+        }
+    }
+
+# Реплики только для чтения (portal/routers.py): DB_REPLICAS — хосты Postgres
+# (или файлы SQLite) через запятую, с теми же учётными данными, что у default.
+# После записи пользователь REPLICA_STICKY_SECONDS читает из основной БД.
+_REPLICA_KEY = "HOST" if DATABASES["default"]["ENGINE"].endswith("postgresql") else "NAME"
+for _i, _replica in enumerate(filter(None, os.getenv("DB_REPLICAS", "").split(",")), 1):
+    DATABASES[f"replica{_i}"] = {
+        **DATABASES["default"], _REPLICA_KEY: _replica, "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["portal.routers.ReplicaRouter"]
+PORTAL_REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+
+# Кэш — общий для всех воркеров gunicorn: Redis, если задан REDIS_URL,
+# иначе файловый (locmem у каждого процесса свой и не видит инвалидаций)
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        },
+        "sessions": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+            "KEY_PREFIX": "session",
+        },
+    }
+else:
+    CACHE_DIR = Path(os.getenv("CACHE_DIR", BASE_DIR / "cache"))
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": CACHE_DIR,
+        },
+        # отдельный каталог: файловый кэш при 300 записях (по умолчанию)
+        # выбрасывает треть — сессии бы вытеснялись страницами и наоборот
+        "sessions": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": CACHE_DIR / "sessions",
+            "OPTIONS": {"MAX_ENTRIES": 100_000},
+        },
+    }
+PORTAL_CACHE_TTL = 60 * 60  # главная и карточки новостей/мероприятий, сек.
+
+# Сессии. По умолчанию cached_db: чтение из кэша, запись сквозная — и в кэш,
+# и в django_session, так что при потере кэша сессия поднимается из БД.
+# cache — только кэш (имеет смысл с Redis), signed_cookies — вся сессия
+# в подписанной cookie, БД не трогается вовсе. Просроченные строки
+# django_session удаляет `manage.py clearsessions` (cron, раз в сутки).
+SESSION_ENGINE = "django.contrib.sessions.backends." + os.getenv("SESSION_BACKEND", "cached_db")
+SESSION_CACHE_ALIAS = "sessions"
+
+# Async-версии читающих страниц (portal/async_views.py); включает asgi.py
+PORTAL_ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False") == "True"
+
+# Замеры запросов (portal.timing): заголовок Server-Timing и лог медленного SQL
+PORTAL_SERVER_TIMING = os.getenv("SERVER_TIMING", "True") == "True"
+PORTAL_SLOW_QUERY_MS = int(os.getenv("SLOW_QUERY_MS", "100"))
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -85,6 +182,11 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'portal' / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# collectstatic: имена с хэшем содержимого + сжатые .gz/.br (portal/assets.py)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "portal.assets.CompressedManifestStorage"},
+}
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 INSTALLED_APPS += ["widget_tweaks"]